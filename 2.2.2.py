@@ -1,12 +1,5 @@
 import csv
 import re
-import pdfkit
-from jinja2 import Environment, FileSystemLoader
-import numpy as np
-from matplotlib import pyplot as plt
-from openpyxl import Workbook
-from openpyxl.styles import Side, Font, Border, Alignment
-from openpyxl.utils import get_column_letter
 
 currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76, "KZT": 0.13, "RUR": 1,
                    "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
@@ -23,12 +16,17 @@ class Report:
         self.cities_salary = cities_data
         self.cities_procent = cities_procent
 
+        from openpyxl import Workbook
+
         self.workbook = Workbook()
         self.sheet_years = self.workbook.active
         self.sheet_years.title = 'Статистика по годам'
         self.sheet_cities = self.workbook.create_sheet('Статистика по городам')
 
     def generate_pdf(self):
+        import pdfkit
+        from jinja2 import Environment, FileSystemLoader
+
         env = Environment(loader=FileSystemLoader('.'))
         template = env.get_template("template.html")
         statistics = []
@@ -80,6 +78,9 @@ class Report:
 
     @staticmethod
     def sheet_formatting(sheet):
+        from openpyxl.styles import Side, Font, Border, Alignment
+        from openpyxl.utils import get_column_letter
+
         edge = Side(border_style='thin', color='000000')
         for index, column in enumerate(sheet.columns):
             cell_width = 0
@@ -106,6 +107,9 @@ class SetGraph:
         self.cities_salary = cities_data
         self.cities_procent = cities_procent
 
+        import numpy as np
+        from matplotlib import pyplot as plt
+
         self.o_x = np.arange(len(self.vacancies_count.keys()))
         self.o_y = np.arange(len(self.cities_salary.keys()))
         self.figure, self.axes = plt.subplots(2, 2, figsize=(8.5, 6))
@@ -117,7 +121,7 @@ class SetGraph:
         SetGraph.create_vacancy_count_graph(self)
         SetGraph.create_cities_salary_graph(self)
         self.figure.tight_layout()
-        plt.savefig('graph.png')
+        self.figure.savefig('graph.png')
 
     def create_salary_graph(self):
         self.axes[0, 0].bar(self.o_x - self.width / 2, self.vacancies_salary.values(), self.width, label='Средняя з/п')
@@ -283,28 +287,29 @@ class InputConect:
         self.data.set_data_for_graphics()
 
 
-vacancy_or_statistics = input('Вакансии или Статистика: ')
-input_file_name = input('Введите название файла: ')
-input_profession = input('Введите название профессии: ')
-
-input_conect = InputConect(input_file_name, input_profession)
-print(f'Динамика уровня зарплат по годам: {input_conect.data.vacancies_data}')
-print(f'Динамика количества вакансий по годам: {input_conect.data.vacancies_counter}')
-print(f'Динамика уровня зарплат по годам для выбранной профессии: {input_conect.data.profession_data}')
-print(f'Динамика количества вакансий по годам для выбранной профессии: {input_conect.data.profession_counter}')
-print(f'Уровень зарплат по городам (в порядке убывания): {input_conect.data.cut_city_data}')
-print(f'Доля вакансий по городам (в порядке убывания): {input_conect.data.cut_city_procent}')
-vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
-if vacancy_or_statistics == 'Вакансии':
-    wb = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
-    wb.generate_excel()
-else:
-    graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
-    graph.create_graph()
-
-
-# vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
-# graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
-# graph.create_graph()
-# pdf = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
-# pdf.generate_pdf()
+if __name__ == '__main__':
+    vacancy_or_statistics = input('Вакансии или Статистика: ')
+    input_file_name = input('Введите название файла: ')
+    input_profession = input('Введите название профессии: ')
+
+    input_conect = InputConect(input_file_name, input_profession)
+    print(f'Динамика уровня зарплат по годам: {input_conect.data.vacancies_data}')
+    print(f'Динамика количества вакансий по годам: {input_conect.data.vacancies_counter}')
+    print(f'Динамика уровня зарплат по годам для выбранной профессии: {input_conect.data.profession_data}')
+    print(f'Динамика количества вакансий по годам для выбранной профессии: {input_conect.data.profession_counter}')
+    print(f'Уровень зарплат по городам (в порядке убывания): {input_conect.data.cut_city_data}')
+    print(f'Доля вакансий по городам (в порядке убывания): {input_conect.data.cut_city_procent}')
+    vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
+    if vacancy_or_statistics == 'Вакансии':
+        wb = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
+        wb.generate_excel()
+    else:
+        graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
+        graph.create_graph()
+
+
+    # vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
+    # graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
+    # graph.create_graph()
+    # pdf = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
+    # pdf.generate_pdf()
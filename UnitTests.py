@@ -1,5 +1,38 @@
+import csv
+import os
+import tempfile
+from datetime import datetime
 from unittest import TestCase
-from task232 import Vacancy, Report
+import numpy as np
+from openpyxl import load_workbook
+from task232 import Vacancy, Report, currency_to_rub
+from task233 import parse_date_with_strptime_function
+from vacancy_table import VacancyTable
+from aggregation import aggregate_table
+from aggregates import SalaryAccumulator, VacancyStatistics, SpaceSaving, top_items
+import main
+from csv_chunks import read_title, find_record_boundaries, read_records
+from dataset_cache import load_table, save_table
+from name_index import NameIndex
+from quantiles import QuantileSketch, QUANTILES, grouped_sketches
+from cube import SalaryCube
+from dates import published_at_epoch, published_at_epochs, month_ordinal, month_ordinals
+from currency_rates import RateTable, load_rates
+from report_model import ReportModel
+from pdf_backends import PdfBackend, PythonPdfBackend, parse_report_html, read_image
+from import_benchmark import loaded_backends, cli_statistics_code, BACKEND_MODULES, COLUMNAR_MODULES
+
+
+def temp_directory(test: TestCase) -> str:
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return directory.name
+
+
+def vacancies_file(directory: str, rows: list = None) -> str:
+    file_name = os.path.join(directory, 'vacancies.csv')
+    YearFilesTests.write_csv(file_name, YearFilesTests.rows if rows is None else rows)
+    return file_name
 
 
 class SalaryTests(TestCase):
@@ -28,3 +61,565 @@ class DateConverterTests(TestCase):
 
     def test_procent_convert_many_symbols_after_dot(self):
         self.assertDictEqual(Report('Программист', {2017: 20000}, {2017: 50}, {2017: 50000}, {2017: 5}, {'Москва': 0.56532523}, {'Москва': 10000}).procent_format(), {'Москва': '56.53%'})
+
+
+class VacancyTableTests(TestCase):
+    rows = [{'name': 'Аналитик', 'salary_from': '20000.0', 'salary_to': '30000.0', 'salary_currency': 'RUR', 'area_name': 'Екатеринбург', 'published_at': '2022-07-05T18:19:30+0300'},
+            {'name': 'Программист', 'salary_from': '1000.0', 'salary_to': '3000.0', 'salary_currency': 'USD', 'area_name': 'Москва', 'published_at': '2021-07-05T18:19:30+0300'},
+            {'name': 'Аналитик', 'salary_from': '40000.0', 'salary_to': '50000.0', 'salary_currency': 'RUR', 'area_name': 'Екатеринбург', 'published_at': '2022-01-05T18:19:30+0300'}]
+
+    def test_dictionary_encoding(self):
+        table = VacancyTable.from_rows(self.rows)
+        self.assertEqual(table.cities, ['Екатеринбург', 'Москва'])
+        self.assertEqual(table.area_id.tolist(), [0, 1, 0])
+        self.assertEqual(table.name_id.tolist(), [0, 1, 0])
+
+    def test_column_types(self):
+        table = VacancyTable.from_rows(self.rows)
+        self.assertEqual((table.salary_from.dtype, table.salary_currency.dtype, table.published_at.dtype), (np.int32, np.uint8, np.int16))
+
+    def test_average_salary_matches_vacancy(self):
+        table = VacancyTable.from_rows(self.rows)
+        self.assertEqual(table.average_salary(main.currency_to_rub).tolist(), [main.Vacancy(row).avarage_salary for row in self.rows])
+
+
+class AggregateTableTests(TestCase):
+    def test_year_statistics(self):
+        statistics = aggregate_table(VacancyTable.from_rows(VacancyTableTests.rows), 'Аналитик', main.currency_to_rub)
+        self.assertEqual(statistics.years.items(), [(2022, 70000, 2), (2021, 121320, 1)])
+        self.assertEqual(statistics.profession_years['Аналитик'].items(), [(2022, 70000, 2)])
+
+    def test_city_statistics(self):
+        statistics = aggregate_table(VacancyTable.from_rows(VacancyTableTests.rows), 'Аналитик', main.currency_to_rub)
+        self.assertEqual(statistics.cities.items(), [('Екатеринбург', 70000, 2), ('Москва', 121320, 1)])
+        self.assertEqual(statistics.total, 3)
+
+
+class YearFilesTests(TestCase):
+    title = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+    rows = [['Аналитик', '20000.0', '30000.0', 'RUR', 'Москва', '2021-07-05T18:19:30+0300'],
+            ['Программист', '40000.0', '50000.0', 'RUR', 'Москва', '2021-07-05T18:19:30+0300'],
+            ['Аналитик', '60000.0', '80000.0', 'RUR', 'Пермь', '2022-07-05T18:19:30+0300']]
+
+    @classmethod
+    def write_csv(cls, file_name, rows):
+        with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(cls.title)
+            writer.writerows(rows)
+
+    def test_year_files_match_single_file(self):
+        directory = temp_directory(self)
+        single = main.DataSet(vacancies_file(directory), 'Аналитик')
+        single.set_data_for_graphics()
+        years_directory = os.path.join(directory, 'CSV')
+        os.mkdir(years_directory)
+        self.write_csv(os.path.join(years_directory, '2021.csv'), self.rows[:2])
+        self.write_csv(os.path.join(years_directory, '2022.csv'), self.rows[2:])
+        parallel = main.DataSet(years_directory, 'Аналитик', streaming=True)
+        parallel.set_data_from_year_files(years_directory, workers=2)
+        self.assertEqual(parallel.get_data(), single.get_data())
+
+
+class ByteRangeTests(TestCase):
+    rows = [['Аналитик', 'SQL\nExcel\nPython', '20000.0', 'RUR', 'Москва'],
+            ['Программист', 'Скажите "да"\nи "нет"', '40000.0', 'RUR', 'Пермь'],
+            ['Бухгалтер', '1С', '30000.0', 'RUR', 'Москва']] * 5
+
+    def test_ranges_do_not_split_quoted_fields(self):
+        file_name = os.path.join(temp_directory(self), 'vacancies.csv')
+        with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['name', 'key_skills', 'salary_from', 'salary_currency', 'area_name'])
+            writer.writerows(self.rows)
+        title, start = read_title(file_name)
+        boundaries = find_record_boundaries(file_name, 8, start, block_size=16)
+        records = [record for begin, end in zip(boundaries, boundaries[1:])
+                   for record in read_records(file_name, begin, end)]
+        self.assertEqual(title[0], 'name')
+        self.assertGreater(len(boundaries), 3)
+        self.assertEqual(records, self.rows)
+
+
+class DatasetCacheTests(TestCase):
+    def test_cache_round_trip_and_invalidation(self):
+        directory = temp_directory(self)
+        file_name = vacancies_file(directory)
+        cache_dir = os.path.join(directory, 'cache')
+        table = main.DataSet(file_name, 'Аналитик', columnar=True).table
+        self.assertIsNone(load_table(file_name, cache_dir))
+        save_table(table, file_name, cache_dir)
+        cached = load_table(file_name, cache_dir)
+        self.assertEqual(cached.cities, table.cities)
+        self.assertEqual(cached.salary_from.tolist(), table.salary_from.tolist())
+        YearFilesTests.write_csv(file_name, YearFilesTests.rows[:2])
+        self.assertIsNone(load_table(file_name, cache_dir))
+
+
+class ProjectionTests(TestCase):
+    def test_projected_rows(self):
+        file_name = vacancies_file(temp_directory(self))
+        rows = list(main.DataSet(file_name, 'Аналитик', streaming=True).read_rows(('name', 'area_name')))
+        self.assertEqual(rows[0], {'name': 'Аналитик', 'area_name': 'Москва'})
+
+    def test_lazy_row_cleans_on_access(self):
+        row = main.LazyRow({'name': 0, 'description': 1}, ['Аналитик', '<p>Много   <b>текста</b></p>'])
+        self.assertEqual(row['name'], 'Аналитик')
+        self.assertNotIn('description', row.cleaned)
+        self.assertEqual(row['description'], 'Много текста')
+
+
+class IncrementalTests(TestCase):
+    def test_appended_rows_update_statistics(self):
+        directory = temp_directory(self)
+        state_file = os.path.join(directory, 'state.json')
+        file_name = vacancies_file(directory, YearFilesTests.rows[:2])
+        main.DataSet(file_name, 'Аналитик', streaming=True).set_data_incremental(state_file)
+        with open(file_name, 'a', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows(YearFilesTests.rows[2:])
+        updated = main.DataSet(file_name, 'Аналитик', streaming=True)
+        updated.set_data_incremental(state_file)
+        full = main.DataSet(file_name, 'Аналитик')
+        full.set_data_for_graphics()
+        self.assertEqual(updated.get_data(), full.get_data())
+        self.assertEqual(updated.total_counter, 3)
+
+    def test_state_with_other_settings_is_reprocessed(self):
+        directory = temp_directory(self)
+        state_file = os.path.join(directory, 'state.json')
+        file_name = vacancies_file(directory)
+        main.DataSet(file_name, 'Аналитик', streaming=True).set_data_incremental(state_file)
+        for options in {'quantiles': True}, {'city_capacity': 5}:
+            resumed = main.DataSet(file_name, 'Аналитик', streaming=True, **options)
+            resumed.set_data_incremental(state_file)
+            full = main.DataSet(file_name, 'Аналитик', **options)
+            full.set_data_for_graphics()
+            self.assertEqual(resumed.get_data(), full.get_data())
+            self.assertEqual(resumed.vacancies_quantiles, full.vacancies_quantiles)
+
+
+class AccumulatorTests(TestCase):
+    def test_merge_is_associative(self):
+        first, second, third = (SalaryAccumulator([(2021, 100, 1)]), SalaryAccumulator([(2022, 300, 2)]),
+                                SalaryAccumulator([(2021, 50, 1), (2022, 10, 1)]))
+        self.assertEqual((first + second) + third, first + (second + third))
+        self.assertDictEqual((first + second + third).averages(), {2021: 75, 2022: 103})
+
+    def test_statistics_round_trip(self):
+        statistics = VacancyStatistics('Аналитик')
+        for row in VacancyTableTests.rows:
+            statistics.add(main.Vacancy(row))
+        file_name = os.path.join(temp_directory(self), 'statistics.json')
+        statistics.save(file_name)
+        self.assertEqual(VacancyStatistics.load(file_name), statistics)
+
+    def test_merge_requires_same_profession(self):
+        with self.assertRaises(ValueError):
+            VacancyStatistics('Аналитик').merge(VacancyStatistics('Программист'))
+
+
+class ManyProfessionsTests(TestCase):
+    def test_one_pass_matches_separate_runs(self):
+        professions = ['Аналитик', 'Программист', 'Тестировщик']
+        file_name = vacancies_file(temp_directory(self))
+        for columnar in (False, True):
+            data = main.DataSet(file_name, professions, columnar=columnar)
+            data.set_data_for_graphics()
+            for profession in professions:
+                single = main.DataSet(file_name, profession)
+                single.set_data_for_graphics()
+                self.assertDictEqual(data.professions_data[profession], single.profession_data)
+                self.assertDictEqual(data.professions_counter[profession], single.profession_counter)
+
+    def test_empty_profession_list(self):
+        file_name = vacancies_file(temp_directory(self))
+        single = main.DataSet(file_name, 'Аналитик')
+        single.set_data_for_graphics()
+        for options in {}, {'columnar': True}, {'streaming': True}:
+            data = main.DataSet(file_name, [], **options)
+            data.set_data_for_graphics()
+            self.assertEqual((data.profession_data, data.profession_counter, data.professions_data), ({}, {}, {}))
+            self.assertEqual(data.vacancies_data, single.vacancies_data)
+            self.assertEqual(data.period_series('year')[2:], ({}, {}))
+
+
+class NameIndexTests(TestCase):
+    def test_index_matches_scan(self):
+        table = VacancyTable.from_rows(VacancyTableTests.rows * 3)
+        index = NameIndex.build(table)
+        for query in ('Аналитик', 'ст', 'Менеджер'):
+            expected = [row for row, name_id in enumerate(table.name_id.tolist()) if query in table.names[name_id]]
+            self.assertEqual(index.rows(query).tolist(), expected)
+
+    def test_indexed_dataset_matches_scan(self):
+        directory = temp_directory(self)
+        file_name = vacancies_file(directory)
+        single = main.DataSet(file_name, 'Аналитик')
+        single.set_data_for_graphics()
+        for _ in range(2):
+            indexed = main.DataSet(file_name, 'Аналитик', indexed=True, cache_dir=os.path.join(directory, 'cache'))
+            indexed.set_data_for_graphics()
+            self.assertEqual(indexed.get_data(), single.get_data())
+        self.assertEqual(indexed.query_profession('Программист'), ({2021: 45000}, {2021: 1}))
+        plain = main.DataSet(file_name, 'Аналитик')
+        plain.set_data_for_graphics()
+        self.assertEqual(plain.query_profession('Программист'), ({2021: 45000}, {2021: 1}))
+
+
+class NameMatchMemoTests(TestCase):
+    def test_matching_runs_once_per_distinct_name(self):
+        file_name = vacancies_file(temp_directory(self), YearFilesTests.rows * 4)
+        data = main.DataSet(file_name, 'Аналитик')
+        data.set_data_for_graphics(vectorized=False)
+        self.assertEqual(data.statistics.name_matches, {'Аналитик': (0,), 'Программист': ()})
+        self.assertEqual(data.profession_counter, {2021: 4, 2022: 4})
+
+
+class HeavyHittersTests(TestCase):
+    def test_space_saving_keeps_frequent_cities(self):
+        cities = ['Москва'] * 30 + ['Пермь'] * 20 + [f'Город {i}' for i in range(50)]
+        np.random.default_rng(0).shuffle(cities)
+        exact, parts = SalaryAccumulator(), [SpaceSaving(10), SpaceSaving(10)]
+        for index, city in enumerate(cities):
+            exact.add(city, 1000)
+            parts[index % 2].add(city, 1000)
+        merged = parts[0] + parts[1]
+        for sketch in parts[0], merged:
+            self.assertLessEqual(len(sketch), 10)
+        for city, count in exact.counts.items():
+            lower, upper = merged.bounds(city)
+            self.assertLessEqual(lower, count)
+            self.assertLessEqual(count, upper)
+        self.assertEqual(list(top_items(merged.counts, 2)), ['Москва', 'Пермь'])
+
+    def test_exact_when_capacity_is_enough(self):
+        file_name = vacancies_file(temp_directory(self))
+        exact = main.DataSet(file_name, 'Аналитик')
+        exact.set_data_for_graphics()
+        bounded = main.DataSet(file_name, 'Аналитик', streaming=True, city_capacity=2)
+        bounded.set_data_for_graphics()
+        self.assertEqual(bounded.get_data(), exact.get_data())
+        self.assertEqual(bounded.city_bounds, {'Москва': (2, 2), 'Пермь': (1, 1)})
+
+    def test_rare_cities_do_not_enter_top(self):
+        shares = [20, 12, 8, 6, 5, 4, 3, 2.5, 2, 1.5, 1.2, 1.1]
+        cities = [f'Город {i}' for i, share in enumerate(shares) for _ in range(int(share * 20))]
+        cities += [f'Поселок {i}' for i in range(2000 - len(cities))]
+        np.random.default_rng(0).shuffle(cities)
+        rows = [['Аналитик', '20000.0', '30000.0', 'RUR', city, '2022-07-05T18:19:30+0300'] for city in cities]
+        file_name = vacancies_file(temp_directory(self), rows)
+        exact = main.DataSet(file_name, 'Аналитик')
+        exact.set_data_for_graphics()
+        bounded = main.DataSet(file_name, 'Аналитик', streaming=True, city_capacity=20)
+        bounded.set_data_for_graphics()
+        top = list(bounded.cut_city_procent)
+        self.assertEqual(top, list(exact.cut_city_procent)[:len(top)])
+        self.assertGreaterEqual(len(top), sum(share > 100 / 20 for share in shares))
+        for city, share in bounded.cut_city_procent.items():
+            self.assertLessEqual(share, exact.city_procent[city])
+
+
+class QuantileSketchTests(TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        salaries = np.random.default_rng(0).lognormal(11, 0.6, 5000).astype(int)
+        halves = QuantileSketch(), QuantileSketch()
+        for index, salary in enumerate(salaries.tolist()):
+            halves[index % 2].add(salary)
+        merged = halves[0] + halves[1]
+        self.assertEqual(merged, grouped_sketches(np.zeros(len(salaries), dtype=int), salaries, 1)[0])
+        for name, q in QUANTILES.items():
+            exact = np.quantile(salaries, q, method='lower')
+            self.assertLessEqual(abs(merged.quantile(q) - exact), exact * 0.011)
+
+    def test_row_and_vectorized_quantiles_match(self):
+        file_name = vacancies_file(temp_directory(self))
+        results = []
+        for columnar in (False, True):
+            data = main.DataSet(file_name, 'Аналитик', columnar=columnar, quantiles=True)
+            data.set_data_for_graphics()
+            results.append((data.vacancies_quantiles, data.city_quantiles))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(list(results[0][0]), list(QUANTILES))
+        self.assertEqual(list(results[0][1]['median']), ['Москва', 'Пермь'])
+
+    def test_city_sketches_stay_within_capacity(self):
+        rows = [dict(VacancyTableTests.rows[0], area_name=f'Город {i % 40}') for i in range(200)]
+        statistics = VacancyStatistics('Аналитик', city_capacity=5, quantiles=True)
+        for row in rows:
+            statistics.add(main.Vacancy(row))
+        merged = statistics + aggregate_table(VacancyTable.from_rows(rows), 'Аналитик', main.currency_to_rub,
+                                              quantiles=True)
+        for result in statistics, merged:
+            self.assertLessEqual(len(result.city_sketches), 5)
+            self.assertEqual(set(result.city_sketches), set(result.cities.counts))
+
+    def test_graph_draws_present_quantiles(self):
+        for quantiles in {'median': {2022: 30000}}, {'p90': {2022: 40000}}, {'p25': {2022: 20000}}:
+            graph = main.SetGraph({2022: 35000}, {2022: 2}, {2022: 35000}, {2022: 2}, {'Пермь': 1.0},
+                                  {'Пермь': 35000}, 'Аналитик', quantiles, {'p90': {'Пермь': 40000}})
+            self.assertTrue(graph.image().startswith(b'\x89PNG'))
+
+
+class SalaryCubeTests(TestCase):
+    def test_cube_matches_raw_file(self):
+        directory = temp_directory(self)
+        file_name = vacancies_file(directory)
+        cache_dir = os.path.join(directory, 'cache')
+        main.build_cube(file_name, ['Аналитик', 'Программист'], cache_dir)
+        for profession in 'Аналитик', 'Программист':
+            raw = main.DataSet(file_name, profession)
+            raw.set_data_for_graphics()
+            cubed = main.DataSet(file_name, profession, cache_dir=cache_dir, cube=True)
+            cubed.set_data_for_graphics()
+            self.assertIsNotNone(cubed.cube)
+            self.assertEqual(cubed.get_data(), raw.get_data())
+        self.assertIsNone(main.DataSet(file_name, 'Тестировщик', cache_dir=cache_dir, cube=True).cube)
+
+    def test_currency_slice(self):
+        table = VacancyTable.from_rows(VacancyTableTests.rows)
+        statistics = SalaryCube.build(table, 'Аналитик', main.currency_to_rub).statistics('Аналитик', ['USD'])
+        self.assertEqual(statistics.years.items(), [(2021, 121320, 1)])
+        self.assertEqual(len(statistics.profession_years['Аналитик']), 0)
+
+
+class PublishedAtTests(TestCase):
+    dates = ['2022-07-05T18:19:30+0300', '2021-01-31T23:59:59-0500', '2020-02-29T00:00:00+0000']
+
+    def test_fast_parser_matches_strptime(self):
+        expected = [int(datetime.strptime(date, '%Y-%m-%dT%H:%M:%S%z').timestamp()) for date in self.dates]
+        self.assertEqual([published_at_epoch(date) for date in self.dates], expected)
+        self.assertEqual(published_at_epochs(self.dates).tolist(), expected)
+        self.assertEqual(month_ordinals(self.dates).tolist(), [month_ordinal(date) for date in self.dates])
+
+    def test_strptime_reference_writes_no_profile(self):
+        current = os.getcwd()
+        os.chdir(temp_directory(self))
+        try:
+            self.assertEqual(parse_date_with_strptime_function(self.dates[0]), '5.7.2022')
+            self.assertEqual(os.listdir(), [])
+        finally:
+            os.chdir(current)
+
+    def test_quarter_series(self):
+        rows = [[dict(row, published_at=date)[column] for column in YearFilesTests.title]
+                for row, date in zip(VacancyTableTests.rows, self.dates)]
+        expected = ({'2020-Q1': 45000, '2021-Q1': 121320, '2022-Q3': 25000}, {'2020-Q1': 1, '2021-Q1': 1, '2022-Q3': 1},
+                    {'2020-Q1': 45000, '2021-Q1': 0, '2022-Q3': 25000}, {'2020-Q1': 1, '2021-Q1': 0, '2022-Q3': 1})
+        file_name = vacancies_file(temp_directory(self), rows)
+        for columnar in (False, True):
+            self.assertEqual(main.DataSet(file_name, 'Аналитик', columnar=columnar).period_series('quarter'), expected)
+
+
+class CurrencyRatesTests(TestCase):
+    cbr_xml = """<?xml version="1.0" encoding="windows-1251"?>
+<Rates>
+<ValCurs Date="05.07.2021" name="Foreign Currency Market"><Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal><Name>Доллар США</Name><Value>72,5000</Value></Valute><Valute ID="R01335"><NumCode>398</NumCode><CharCode>KZT</CharCode><Nominal>100</Nominal><Name>Тенге</Name><Value>17,0000</Value></Valute></ValCurs>
+<ValCurs Date="06.07.2021" name="Foreign Currency Market"><Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal><Name>Доллар США</Name><Value>73,5000</Value></Valute></ValCurs>
+<ValCurs Date="01.03.2022" name="Foreign Currency Market"><Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal><Name>Доллар США</Name><Value>100,0000</Value></Valute></ValCurs>
+</Rates>"""
+
+    def load(self, directory):
+        file_name = os.path.join(directory, 'rates.xml')
+        with open(file_name, 'w', encoding='windows-1251') as file:
+            file.write(self.cbr_xml)
+        return load_rates(file_name, main.currency_to_rub)
+
+    def test_cbr_xml_monthly_rates(self):
+        directory = temp_directory(self)
+        rates = self.load(directory)
+        self.assertEqual(rates.rate('USD', month_ordinal('2021-07')), 73.0)
+        self.assertEqual(rates.rate('USD', month_ordinal('2021-12')), 73.0)
+        self.assertEqual(rates.rate('USD', month_ordinal('2023-01')), 100.0)
+        self.assertEqual(rates.rate('KZT', month_ordinal('2020-01')), 0.17)
+        self.assertEqual(rates.rate('EUR', month_ordinal('2021-07')), main.currency_to_rub['EUR'])
+        self.assertIs(load_rates(os.path.join(directory, 'rates.xml'), main.currency_to_rub), rates)
+
+    def test_incremental_state_tracks_rates(self):
+        rows = YearFilesTests.rows + [['Аналитик', '1000.0', '1000.0', 'USD', 'Пермь', '2022-07-05T18:19:30+0300']]
+        rates = RateTable.from_observations([('USD', month_ordinal('2022-07'), 90.0)], main.currency_to_rub)
+        directory = temp_directory(self)
+        state_file = os.path.join(directory, 'state.json')
+        file_name = vacancies_file(directory, rows)
+        main.DataSet(file_name, 'Аналитик', streaming=True).set_data_incremental(state_file)
+        resumed = main.DataSet(file_name, 'Аналитик', streaming=True, rates=rates)
+        resumed.set_data_incremental(state_file)
+        full = main.DataSet(file_name, 'Аналитик', rates=rates)
+        full.set_data_for_graphics()
+        self.assertEqual(resumed.get_data(), full.get_data())
+        self.assertEqual(resumed.profession_data[2022], (70000 + 90000) // 2)
+
+    def test_table_matches_vacancy(self):
+        rates = self.load(temp_directory(self))
+        table = VacancyTable.from_rows(VacancyTableTests.rows)
+        expected = [main.Vacancy(row, rates).avarage_salary for row in VacancyTableTests.rows]
+        self.assertEqual(expected, [25000, 146000, 45000])
+        self.assertEqual(table.average_salary(rates).tolist(), expected)
+        self.assertEqual(table.average_salary(rates, np.array([1])).tolist(), expected[1:2])
+
+
+class StreamingExcelTests(TestCase):
+    arguments = ('Аналитик', {2021: 0, 2022: 35000}, {2021: 1, 2022: 2}, {2021: 0, 2022: 35000}, {2021: 0, 2022: 2},
+                 {'Москва': 0.5, 'Екатеринбург': 0.25, 'Пермь': 0.25}, {'Москва': 121320, 'Екатеринбург': 0})
+
+    @staticmethod
+    def snapshot(file_name: str) -> list:
+        workbook = load_workbook(file_name)
+        cells = []
+        for sheet in workbook.worksheets:
+            cells.append((sheet.title, {key: value.width for key, value in sheet.column_dimensions.items()}))
+            cells.extend((cell.coordinate, cell.value, cell.font.b, cell.border.left.style, cell.alignment.horizontal)
+                         for row in sheet.iter_rows() for cell in row)
+        return cells
+
+    def test_streaming_matches_regular(self):
+        arguments = self.arguments
+        quantiles = {'salary_quantiles': {'median': {2021: 0, 2022: 30000}},
+                     'city_quantiles': {'median': {'Москва': 121320, 'Екатеринбург': 0}}}
+        current = os.getcwd()
+        os.chdir(temp_directory(self))
+        try:
+            for options in {}, quantiles:
+                main.Report(*arguments, **options).generate_excel()
+                regular = self.snapshot('report.xlsx')
+                main.Report(*arguments, **options).generate_excel(streaming=True)
+                self.assertEqual(self.snapshot('report.xlsx'), regular)
+        finally:
+            os.chdir(current)
+
+    def test_native_charts(self):
+        arguments = self.arguments
+        current = os.getcwd()
+        os.chdir(temp_directory(self))
+        try:
+            main.Report(*arguments).generate_excel(charts=True)
+            regular = self.snapshot('report.xlsx')
+            main.Report(*arguments).generate_excel(streaming=True, charts=True)
+            self.assertEqual(self.snapshot('report.xlsx'), regular)
+            workbook = load_workbook('report.xlsx')
+        finally:
+            os.chdir(current)
+        self.assertEqual(workbook.sheetnames, ['Статистика по годам', 'Статистика по городам', 'Графики'])
+        sheet = workbook['Графики']
+        self.assertEqual([type(chart).__name__ for chart in sheet._charts], ['BarChart', 'BarChart', 'BarChart',
+                                                                             'PieChart'])
+        self.assertEqual(list(sheet.iter_rows(values_only=True)),
+                         [('Город', 'Доля вакансий'), ('Москва', 0.5), ('Екатеринбург', 0.25), ('Пермь', 0.25),
+                          ('Другие', 0)])
+
+
+class BatchExcelTests(TestCase):
+    def test_sheet_per_profession(self):
+        directory = temp_directory(self)
+        file_name = vacancies_file(directory)
+        data = main.DataSet(file_name, ['Аналитик', 'Программист'], columnar=True)
+        data.set_data_for_graphics()
+        report_name = os.path.join(directory, 'report.xlsx')
+        main.generate_batch_excel(data.vacancies_data, data.vacancies_counter, data.professions_data,
+                                  data.professions_counter, data.cut_city_procent, data.cut_city_data,
+                                  report_name, workers=2)
+        workbook = load_workbook(report_name)
+        self.assertEqual(workbook.sheetnames, ['Все вакансии', 'Статистика по городам', 'Аналитик', 'Программист'])
+        for profession in data.professions:
+            rows = list(workbook[profession].iter_rows(min_row=2, values_only=True))
+            self.assertEqual(rows, [(year, data.professions_data[profession][year], count)
+                                    for year, count in data.professions_counter[profession].items()])
+        self.assertEqual(list(workbook['Все вакансии'].iter_rows(min_row=2, values_only=True)),
+                         [(year, data.vacancies_data[year], count) for year, count in data.vacancies_counter.items()])
+
+    def test_pool_matches_in_process(self):
+        directory = temp_directory(self)
+        data = main.DataSet(vacancies_file(directory), ['Аналитик', 'Программист'], columnar=True)
+        data.set_data_for_graphics()
+        arguments = (data.vacancies_data, data.vacancies_counter, data.professions_data, data.professions_counter,
+                     data.cut_city_procent, data.cut_city_data)
+        self.addCleanup(setattr, main, 'BATCH_EXCEL_POOL_PROFESSIONS', main.BATCH_EXCEL_POOL_PROFESSIONS)
+        main.BATCH_EXCEL_POOL_PROFESSIONS = 2
+        sheets = []
+        for workers in 0, 2:
+            report_name = os.path.join(directory, f'report{workers}.xlsx')
+            main.generate_batch_excel(*arguments, report_name, workers=workers)
+            workbook = load_workbook(report_name)
+            sheets.append({title: list(workbook[title].iter_rows(values_only=True)) for title in workbook.sheetnames})
+        self.assertEqual(sheets[1], sheets[0])
+
+
+class ReportModelTests(TestCase):
+    def test_series_aligned_by_year(self):
+        model = ReportModel.build('Аналитик', {2022: 35000, 2021: 121320}, {2021: 1, 2022: 2}, {2022: 35000},
+                                  {2022: 2, 2021: 0}, {'Москва': 0.5, 'Пермь': 0.25}, {'Москва': 121320},
+                                  {'median': {2021: 121320, 2022: 30000}}, {'median': {'Москва': 121320}})
+        self.assertEqual(model.year_rows(), [(2021, 121320, 0, 1, 0, 121320), (2022, 35000, 35000, 2, 2, 30000)])
+        self.assertEqual(model.city_salary_rows(), [('Москва', 121320, 121320)])
+        self.assertEqual(model.city_share_rows(), [('Москва', '50.0%'), ('Пермь', '25.0%')])
+        with self.assertRaises(AttributeError):
+            model.years = ()
+
+    def test_renderers_share_model(self):
+        model = ReportModel.build('Аналитик', {2022: 35000}, {2022: 2}, {2022: 35000}, {2022: 2}, {'Пермь': 1.0},
+                                  {'Пермь': 35000})
+        report = main.Report('Аналитик', {}, {}, {}, {}, {}, {}, model=model)
+        self.assertEqual(list(report.year_rows())[1:], model.year_rows())
+        self.assertIn('100.0%', report.render_html())
+
+
+class PdfBackendTests(TestCase):
+    model = ReportModel.build('Аналитик', {2022: 35000}, {2022: 2}, {2022: 35000}, {2022: 2}, {'Пермь': 1.0},
+                              {'Пермь': 35000})
+
+    def test_report_html_blocks(self):
+        report = main.Report('Аналитик', {}, {}, {}, {}, {}, {}, model=self.model)
+        blocks = parse_report_html(report.render_html())
+        self.assertEqual([kind for kind, _ in blocks], ['heading', 'image', 'heading', 'tables', 'heading', 'tables'])
+        self.assertEqual(blocks[3][1], [[report.year_columns(), ['2022', '35000', '35000', '2', '2']]])
+        self.assertEqual(blocks[5][1], [[['Город', 'Уровень зарплат'], ['Пермь', '35000']],
+                                        [['Город', 'Доля вакансий'], ['Пермь', '100.0%']]])
+
+    def test_python_backend_writes_pdf(self):
+        report = main.Report('Аналитик', {}, {}, {}, {}, {}, {}, model=self.model)
+        file_name = os.path.join(temp_directory(self), 'out.pdf')
+        with PythonPdfBackend(0) as backend:
+            self.assertEqual(backend.render_batch([(report.render_html(), file_name)]), [file_name])
+        with open(file_name, 'rb') as file:
+            self.assertEqual(file.read(5), b'%PDF-')
+
+    def test_backend_requires_job_and_executor(self):
+        class ExecutorOnly(PdfBackend):
+            def create_executor(self):
+                return None
+
+        for backend in PdfBackend, ExecutorOnly:
+            with self.assertRaises(TypeError):
+                backend(0)
+
+
+class InMemoryGraphTests(TestCase):
+    def test_graph_data_uri_in_report(self):
+        model = PdfBackendTests.model
+        graph = main.SetGraph({}, {}, {}, {}, {}, {}, 'Аналитик', model=model)
+        uri = graph.data_uri()
+        self.assertTrue(uri.startswith('data:image/png;base64,'))
+        self.assertEqual(read_image(uri).shape[:2], (600, 850))
+        html = main.Report('Аналитик', {}, {}, {}, {}, {}, {}, model=model).render_html(uri)
+        self.assertEqual(parse_report_html(html)[1], ('image', uri))
+        self.assertIs(main.report_template(), main.report_template())
+
+    def test_batch_graphs_reuse_process_figure(self):
+        model = PdfBackendTests.model
+        other = model._replace(profession='Тестировщик', salaries=(40000,))
+        first, second = main.render_graphs([model, other], workers=0)
+        self.assertEqual(main.render_graph(model), first)
+        self.assertNotEqual(first, second)
+        self.assertEqual(main.graph_figure().axes, [])
+        graph = main.SetGraph({}, {}, {}, {}, {}, {}, 'Аналитик', model=model, layout=main.GRAPH_LAYOUT)
+        self.assertEqual(graph.image(), first)
+
+
+class LazyImportTests(TestCase):
+    def test_entry_points_skip_output_backends(self):
+        for module in 'main', 'task232':
+            self.assertEqual(loaded_backends(module), [])
+            self.assertEqual(loaded_backends(module, COLUMNAR_MODULES), [])
+
+    def test_cli_statistics_skip_heavy_modules(self):
+        code = cli_statistics_code(vacancies_file(temp_directory(self)), 'Аналитик')
+        self.assertEqual(loaded_backends('main', BACKEND_MODULES + COLUMNAR_MODULES, code), [])
@@ -0,0 +1,468 @@
+import heapq
+import json
+
+from profession_matcher import AhoCorasick
+from quantiles import QuantileSketch
+
+
+class SalaryAccumulator:
+    """Суммы и количества зарплат по ключам (годам, городам)
+
+    Ключи хранятся в порядке первого появления. Объединение ассоциативно: результат слияния
+    частичных накопителей не зависит от того, как были сгруппированы данные
+
+    Attributes:
+        sums (dict): Суммы зарплат по ключам
+        counts (dict): Количество вакансий по ключам
+    """
+    def __init__(self, items: list = None):
+        """Инициализирует объект SalaryAccumulator
+
+        Args:
+            items (list): Тройки (ключ, сумма, количество)
+
+        >>> accumulator = SalaryAccumulator([(2022, 50000, 2)])
+        >>> accumulator.add(2021, 30000)
+        >>> accumulator.averages()
+        {2022: 25000, 2021: 30000}
+        """
+        self.sums = {}
+        self.counts = {}
+        for key, salary_sum, count in items or ():
+            self.sums[key] = salary_sum
+            self.counts[key] = count
+
+    def add(self, key, salary: int, count: int = 1):
+        """Добавляет зарплату к ключу
+
+        Args:
+            key (int or str): Ключ
+            salary (int): Зарплата или сумма зарплат
+            count (int): Количество вакансий
+        """
+        if key in self.sums:
+            self.sums[key] += salary
+            self.counts[key] += count
+        else:
+            self.sums[key] = salary
+            self.counts[key] = count
+
+    def merge(self, other: 'SalaryAccumulator') -> 'SalaryAccumulator':
+        """Добавляет суммы и количества другого накопителя
+
+        Args:
+            other (SalaryAccumulator): Другой накопитель
+
+        Returns:
+            SalaryAccumulator: Этот же накопитель
+        """
+        for key, salary_sum in other.sums.items():
+            self.add(key, salary_sum, other.counts[key])
+        return self
+
+    def __add__(self, other: 'SalaryAccumulator') -> 'SalaryAccumulator':
+        return SalaryAccumulator(self.items()).merge(other)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SalaryAccumulator) and self.items() == other.items()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def items(self) -> list:
+        """Возвращает содержимое накопителя
+
+        Returns:
+            list: Тройки (ключ, сумма, количество)
+        """
+        return [(key, salary_sum, self.counts[key]) for key, salary_sum in self.sums.items()]
+
+    def average(self, key) -> int:
+        """Рассчитывает среднюю зарплату по ключу, для отсутствующего ключа возвращает 0
+
+        Args:
+            key (int or str): Ключ
+
+        Returns:
+            int: Средняя зарплата
+        """
+        count = self.counts.get(key, 0)
+        return int(self.sums[key] / count) if count else 0
+
+    def averages(self) -> dict:
+        """Рассчитывает средние зарплаты по всем ключам
+
+        Returns:
+            dict: Средние зарплаты
+        """
+        return {key: self.average(key) for key in self.sums}
+
+
+class SpaceSaving:
+    """Приближенные суммы и количества зарплат по ключам в ограниченной памяти (алгоритм Space-Saving)
+
+    Хранится не больше capacity ключей. Новый ключ при заполненном накопителе вытесняет ключ с наименьшим
+    количеством и наследует это количество как погрешность. Поэтому количество ключа завышено не больше,
+    чем на errors[key] <= total / capacity, и любой ключ с большей долей гарантированно остается в накопителе.
+    Пока различных ключей не больше capacity, результат точный и совпадает с SalaryAccumulator
+
+    Attributes:
+        capacity (int): Максимальное количество ключей
+        sums (dict): Суммы зарплат, учтенных с момента попадания ключа в накопитель
+        counts (dict): Оценки сверху количества вакансий по ключам
+        errors (dict): Максимальное завышение количества по ключам
+        heap (list): Куча пар (количество, ключ) для поиска вытесняемого ключа
+    """
+    def __init__(self, capacity: int, items: list = None, errors: dict = None):
+        """Инициализирует объект SpaceSaving
+
+        Args:
+            capacity (int): Максимальное количество ключей
+            items (list): Тройки (ключ, сумма, количество)
+            errors (dict): Погрешности количеств по ключам
+
+        >>> cities, evicted = SpaceSaving(2), None
+        >>> for city in ['Москва', 'Москва', 'Пермь', 'Омск', 'Москва']:
+        ...     evicted = cities.add(city, 1000) or evicted
+        >>> cities.counts, cities.bounds('Омск'), cities.bounds('Пермь'), evicted
+        ({'Москва': 3, 'Омск': 2}, (1, 2), (0, 2), 'Пермь')
+        """
+        if capacity < 1:
+            raise ValueError('Емкость накопителя должна быть положительной')
+        self.capacity = capacity
+        self.sums = {}
+        self.counts = {}
+        self.errors = {}
+        for key, salary_sum, count in items or ():
+            self.sums[key] = salary_sum
+            self.counts[key] = count
+            self.errors[key] = (errors or {}).get(key, 0)
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def add(self, key, salary: int, count: int = 1):
+        """Добавляет зарплату к ключу, при необходимости вытесняя ключ с наименьшим количеством
+
+        Args:
+            key (int or str): Ключ
+            salary (int): Зарплата или сумма зарплат
+            count (int): Количество вакансий
+
+        Returns:
+            int or str: Вытесненный ключ или None, если никто не вытеснен
+        """
+        if key in self.counts:
+            self.sums[key] += salary
+            self.counts[key] += count
+            return None
+        base, evicted = self.pop_min() if len(self.counts) >= self.capacity else (0, None)
+        self.sums[key] = salary
+        self.counts[key] = base + count
+        self.errors[key] = base
+        heapq.heappush(self.heap, (self.counts[key], key))
+        return evicted
+
+    def pop_min(self) -> int:
+        """Удаляет ключ с наименьшим количеством
+
+        В куче у каждого ключа одна запись, количество в которой может быть устаревшим (меньше текущего).
+        Устаревшие записи обновляются, пока на вершине не окажется актуальная
+
+        Returns:
+            tuple: Количество и удаленный ключ
+        """
+        while True:
+            count, key = self.heap[0]
+            if self.counts[key] == count:
+                heapq.heappop(self.heap)
+                del self.sums[key], self.counts[key], self.errors[key]
+                return count, key
+            heapq.heapreplace(self.heap, (self.counts[key], key))
+
+    def min_count(self) -> int:
+        """Оценка сверху количества для любого ключа, которого нет в накопителе
+
+        Returns:
+            int: Наименьшее количество, если накопитель заполнен, иначе 0
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def bounds(self, key) -> tuple:
+        """Возвращает границы истинного количества вакансий по ключу
+
+        Args:
+            key (int or str): Ключ
+
+        Returns:
+            tuple: Нижняя и верхняя граница
+        """
+        if key not in self.counts:
+            return 0, self.min_count()
+        return self.counts[key] - self.errors[key], self.counts[key]
+
+    def merge(self, other) -> 'SpaceSaving':
+        """Добавляет другой накопитель (SpaceSaving или точный SalaryAccumulator)
+
+        Отсутствующий в одном из накопителей ключ получает от него оценку min_count и такую же погрешность,
+        затем остаются capacity ключей с наибольшими количествами. Границы количеств при этом сохраняются
+
+        Args:
+            other (SpaceSaving or SalaryAccumulator): Другой накопитель
+
+        Returns:
+            SpaceSaving: Этот же накопитель
+        """
+        own_min = self.min_count()
+        other_min = other.min_count() if isinstance(other, SpaceSaving) else 0
+        other_errors = getattr(other, 'errors', {})
+        keys = dict.fromkeys([*self.counts, *other.counts])
+        counts = {key: self.counts.get(key, own_min) + other.counts.get(key, other_min) for key in keys}
+        kept = set(heapq.nlargest(self.capacity, counts, key=counts.get))
+        errors = {key: self.errors.get(key, own_min) + other_errors.get(key, 0 if key in other.counts else other_min)
+                  for key in keys if key in kept}
+        items = [(key, self.sums.get(key, 0) + other.sums.get(key, 0), counts[key]) for key in keys if key in kept]
+        self.__init__(self.capacity, items, errors)
+        return self
+
+    def __add__(self, other) -> 'SpaceSaving':
+        return SpaceSaving(self.capacity, self.items(), self.errors).merge(other)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, SpaceSaving) and self.capacity == other.capacity
+                and self.items() == other.items() and self.errors == other.errors)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def items(self) -> list:
+        """Возвращает содержимое накопителя
+
+        Returns:
+            list: Тройки (ключ, сумма, количество)
+        """
+        return [(key, salary_sum, self.counts[key]) for key, salary_sum in self.sums.items()]
+
+    def average(self, key) -> int:
+        """Рассчитывает среднюю зарплату по вакансиям, учтенным с момента попадания ключа в накопитель
+
+        Args:
+            key (int or str): Ключ
+
+        Returns:
+            int: Средняя зарплата, для отсутствующего ключа 0
+        """
+        count = self.counts.get(key, 0) - self.errors.get(key, 0)
+        return int(self.sums[key] / count) if count else 0
+
+    def averages(self) -> dict:
+        """Рассчитывает средние зарплаты по всем ключам
+
+        Returns:
+            dict: Средние зарплаты
+        """
+        return {key: self.average(key) for key in self.sums}
+
+
+def top_items(mapping: dict, k: int) -> dict:
+    """Выбирает k элементов с наибольшими значениями кучей, не сортируя весь словарь
+
+    Порядок и выбор при равных значениях такие же, как у sorted(..., reverse=True)[:k]
+
+    Args:
+        mapping (dict): Словарь
+        k (int): Количество элементов
+
+    Returns:
+        dict: Элементы в порядке убывания значений
+
+    >>> top_items({'Пермь': 1, 'Москва': 3, 'Омск': 1}, 2)
+    {'Москва': 3, 'Пермь': 1}
+    """
+    return dict(heapq.nlargest(k, mapping.items(), key=lambda item: item[1]))
+
+
+class VacancyStatistics:
+    """Накопленные статистики по вакансиям: зарплаты по годам, по годам для каждой профессии и по городам
+
+    Средние и доли не хранятся, а рассчитываются при чтении, поэтому частичные статистики,
+    полученные из разных файлов, процессов или машин, можно объединять, сохранять и загружать
+
+    Attributes:
+        professions (tuple): Названия профессий
+        years (SalaryAccumulator): Зарплаты по годам
+        profession_years (dict): Зарплаты по годам (SalaryAccumulator) для каждой профессии
+        cities (SalaryAccumulator or SpaceSaving): Зарплаты по городам
+        city_capacity (int): Максимальное количество хранимых городов или None для точного подсчета
+        quantiles (bool): Собираются ли скетчи квантилей зарплат
+        year_sketches (dict): Скетчи квантилей зарплат по годам
+        city_sketches (dict): Скетчи квантилей зарплат по городам. При приближенном подсчете городов
+            скетчи хранятся только для городов, которые сейчас есть в SpaceSaving, и удаляются вместе с ними
+        matcher (AhoCorasick): Автомат поиска названий профессий в названии вакансии
+        name_matches (dict): Найденные профессии для каждого уже встреченного названия вакансии
+    """
+    def __init__(self, professions, years: SalaryAccumulator = None, profession_years: dict = None,
+                 cities: SalaryAccumulator = None, city_capacity: int = None, quantiles: bool = False,
+                 year_sketches: dict = None, city_sketches: dict = None):
+        """Инициализирует объект VacancyStatistics
+
+        Args:
+            professions (str or iterable): Название профессии или список названий
+            years (SalaryAccumulator): Зарплаты по годам
+            profession_years (dict): Зарплаты по годам для каждой профессии
+            cities (SalaryAccumulator or SpaceSaving): Зарплаты по городам
+            city_capacity (int): Если задано, города считаются приближенно в SpaceSaving такой емкости
+            quantiles (bool): Собирать скетчи квантилей зарплат по годам и городам
+            year_sketches (dict): Скетчи квантилей по годам
+            city_sketches (dict): Скетчи квантилей по городам
+        """
+        self.professions = tuple(dict.fromkeys([professions] if isinstance(professions, str) else professions))
+        self.years = SalaryAccumulator() if years is None else years
+        self.profession_years = {} if profession_years is None else profession_years
+        for profession in self.professions:
+            self.profession_years.setdefault(profession, SalaryAccumulator())
+        self.city_capacity = city_capacity
+        if cities is None:
+            cities = SalaryAccumulator() if city_capacity is None else SpaceSaving(city_capacity)
+        self.cities = cities
+        self.quantiles = quantiles
+        self.year_sketches = {} if year_sketches is None else year_sketches
+        self.city_sketches = {} if city_sketches is None else city_sketches
+        self.matcher = AhoCorasick(self.professions)
+        self.name_matches = {}
+
+    @property
+    def total(self) -> int:
+        """Общее количество вакансий"""
+        return sum(self.years.counts.values())
+
+    def match(self, name: str) -> tuple:
+        """Находит профессии, которые входят в название вакансии. Результат запоминается для каждого
+        названия, поэтому автомат запускается один раз на уникальное название, а не на каждую вакансию
+
+        Args:
+            name (str): Название вакансии
+
+        Returns:
+            tuple: Номера профессий в professions
+
+        >>> statistics = VacancyStatistics(['Программист', 'Аналитик'])
+        >>> statistics.match('Программист 1С'), statistics.match('Программист 1С'), len(statistics.name_matches)
+        ((0,), (0,), 1)
+        """
+        matches = self.name_matches.get(name)
+        if matches is None:
+            matches = self.name_matches[name] = tuple(sorted(self.matcher.find(name)))
+        return matches
+
+    def add(self, vacancy):
+        """Добавляет вакансию
+
+        Args:
+            vacancy (Vacancy or VacancyRecord): Вакансия
+        """
+        self.years.add(vacancy.published_at, vacancy.avarage_salary)
+        for index in self.match(vacancy.name):
+            self.profession_years[self.professions[index]].add(vacancy.published_at, vacancy.avarage_salary)
+        evicted = self.cities.add(vacancy.area_name, vacancy.avarage_salary)
+        if self.quantiles:
+            self.city_sketches.pop(evicted, None)
+            for key, sketches in ((vacancy.published_at, self.year_sketches), (vacancy.area_name, self.city_sketches)):
+                if key not in sketches:
+                    sketches[key] = QuantileSketch()
+                sketches[key].add(vacancy.avarage_salary)
+
+    def merge(self, other: 'VacancyStatistics') -> 'VacancyStatistics':
+        """Добавляет другую статистику, посчитанную для тех же профессий
+
+        Args:
+            other (VacancyStatistics): Другая статистика
+
+        Returns:
+            VacancyStatistics: Эта же статистика
+        """
+        if other.professions != self.professions:
+            raise ValueError(f'Нельзя объединить статистики профессий {self.professions} и {other.professions}')
+        self.years.merge(other.years)
+        for profession in self.professions:
+            self.profession_years[profession].merge(other.profession_years[profession])
+        self.cities.merge(other.cities)
+        kept = self.cities.counts if isinstance(self.cities, SpaceSaving) else None
+        if kept is not None:
+            for city in [city for city in self.city_sketches if city not in kept]:
+                del self.city_sketches[city]
+        for sketches, other_sketches, keys in ((self.year_sketches, other.year_sketches, None),
+                                               (self.city_sketches, other.city_sketches, kept)):
+            for key, sketch in other_sketches.items():
+                if keys is not None and key not in keys:
+                    continue
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    sketches[key] = QuantileSketch.from_dict(sketch.to_dict())
+        return self
+
+    def __add__(self, other: 'VacancyStatistics') -> 'VacancyStatistics':
+        return VacancyStatistics.from_dict(self.to_dict()).merge(other)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VacancyStatistics) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        """Преобразует статистику в словарь из списков, пригодный для json
+
+        Returns:
+            dict: Статистика
+        """
+        data = {'professions': list(self.professions), 'years': self.years.items(),
+                'profession_years': {profession: accumulator.items()
+                                     for profession, accumulator in self.profession_years.items()},
+                'cities': self.cities.items()}
+        if self.city_capacity is not None:
+            data['city_capacity'] = self.city_capacity
+            data['city_errors'] = list(self.cities.errors.items())
+        if self.quantiles:
+            data['year_sketches'] = [(year, sketch.to_dict()) for year, sketch in self.year_sketches.items()]
+            data['city_sketches'] = [(city, sketch.to_dict()) for city, sketch in self.city_sketches.items()]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'VacancyStatistics':
+        """Создает статистику из словаря, полученного через to_dict
+
+        Args:
+            data (dict): Статистика
+
+        Returns:
+            VacancyStatistics: Статистика
+        """
+        if 'city_capacity' in data:
+            cities = SpaceSaving(data['city_capacity'], data['cities'], dict(data['city_errors']))
+        else:
+            cities = SalaryAccumulator(data['cities'])
+        return cls(data['professions'], SalaryAccumulator(data['years']),
+                   {profession: SalaryAccumulator(items) for profession, items in data['profession_years'].items()},
+                   cities, data.get('city_capacity'), 'year_sketches' in data,
+                   {year: QuantileSketch.from_dict(sketch) for year, sketch in data.get('year_sketches', ())},
+                   {city: QuantileSketch.from_dict(sketch) for city, sketch in data.get('city_sketches', ())})
+
+    def save(self, file_name: str):
+        """Сохраняет статистику в json файл
+
+        Args:
+            file_name (str): Название файла
+        """
+        with open(file_name, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_name: str) -> 'VacancyStatistics':
+        """Загружает статистику из json файла
+
+        Args:
+            file_name (str): Название файла
+
+        Returns:
+            VacancyStatistics: Статистика
+        """
+        with open(file_name, encoding='utf-8') as file:
+            return cls.from_dict(json.load(file))
@@ -0,0 +1,151 @@
+import numpy as np
+
+from aggregates import SalaryAccumulator, VacancyStatistics
+from quantiles import grouped_sketches
+from dates import PERIOD_MONTHS, period_keys, period_label
+
+
+def grouped_sum(keys: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Суммирует значения по группам
+
+    Пока сумма помещается в мантиссу float64, используется bincount, иначе точное, но более медленное np.add.at
+
+    Args:
+        keys (np.ndarray): Номера групп
+        values (np.ndarray): Целочисленные значения
+        size (int): Количество групп
+
+    Returns:
+        np.ndarray: Суммы по группам, int64
+
+    >>> grouped_sum(np.array([0, 1, 0]), np.array([10, 20, 30]), 3).tolist()
+    [40, 20, 0]
+    """
+    if int(np.abs(values).sum()) < 2 ** 53:
+        return np.bincount(keys, weights=values, minlength=size).astype(np.int64)
+    sums = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, keys, values)
+    return sums
+
+
+def aggregate_rows(table, rows: np.ndarray, currency_to_rub: dict) -> SalaryAccumulator:
+    """Рассчитывает суммы и количества зарплат по годам для выбранных строк таблицы
+
+    Args:
+        table (VacancyTable): Колоночная таблица вакансий
+        rows (np.ndarray): Номера строк
+        currency_to_rub (dict): Курсы валют к рублю
+
+    Returns:
+        SalaryAccumulator: Зарплаты по годам
+    """
+    years, first_index, year_keys = np.unique(table.published_at[rows], return_index=True, return_inverse=True)
+    order = np.argsort(first_index)
+    counts = np.bincount(year_keys, minlength=len(years))[order]
+    sums = grouped_sum(year_keys, table.average_salary(currency_to_rub, rows), len(years))[order]
+    return SalaryAccumulator(zip(years[order].tolist(), sums.tolist(), counts.tolist()))
+
+
+def profession_masks(table, statistics: VacancyStatistics):
+    """Отмечает строки таблицы, в названии которых есть каждая из профессий статистики
+
+    Профессии ищутся один раз на уникальное название, затем результат раскладывается по строкам через name_id
+
+    Args:
+        table (VacancyTable): Колоночная таблица вакансий
+        statistics (VacancyStatistics): Статистика с профессиями
+
+    Yields:
+        tuple: Профессия и маска строк
+    """
+    name_matches = np.zeros((len(statistics.professions), len(table.names)), dtype=bool)
+    for name_id, name in enumerate(table.names):
+        for profession_index in statistics.match(name):
+            name_matches[profession_index, name_id] = True
+    for profession_index, profession in enumerate(statistics.professions):
+        yield profession, name_matches[profession_index][table.name_id]
+
+
+def aggregate_periods(table, professions, currency_to_rub: dict, period: str = 'month') -> VacancyStatistics:
+    """Рассчитывает суммы и количества зарплат по месяцам, кварталам или годам публикации
+
+    Ключи years и profession_years результата - подписи периодов (см. dates.period_label)
+    в хронологическом порядке, города не считаются
+
+    Args:
+        table (VacancyTable): Колоночная таблица вакансий
+        professions (str or iterable): Название профессии или список названий
+        currency_to_rub (dict): Курсы валют к рублю
+        period (str): 'month', 'quarter' или 'year'
+
+    Returns:
+        VacancyStatistics: Статистика по периодам
+    """
+    statistics = VacancyStatistics(professions)
+    periods, period_ids = np.unique(period_keys(table.published_month, period), return_inverse=True)
+    labels = [period_label(key * PERIOD_MONTHS[period], period) for key in periods.tolist()]
+    salary = table.average_salary(currency_to_rub)
+
+    def series(mask=None):
+        keys, values = (period_ids, salary) if mask is None else (period_ids[mask], salary[mask])
+        counts = np.bincount(keys, minlength=len(labels))
+        present = np.flatnonzero(counts)
+        sums = grouped_sum(keys, values, len(labels))
+        return SalaryAccumulator(zip([labels[i] for i in present.tolist()], sums[present].tolist(),
+                                     counts[present].tolist()))
+
+    statistics.years = series()
+    for profession, matched in profession_masks(table, statistics):
+        statistics.profession_years[profession] = series(matched)
+    return statistics
+
+
+def aggregate_table(table, professions, currency_to_rub: dict, index=None, quantiles: bool = False) -> VacancyStatistics:
+    """Рассчитывает суммы и количества зарплат по годам, профессиям и городам групповыми редукциями
+    вместо цикла по вакансиям
+
+    Порядок ключей совпадает с порядком первого появления года и города в файле, как при построчной обработке
+
+    Args:
+        table (VacancyTable): Колоночная таблица вакансий
+        professions (str or iterable): Название профессии или список названий
+        currency_to_rub (dict): Курсы валют к рублю
+        index (NameIndex): Индекс названий этой таблицы. Если задан, строки профессий берутся из индекса
+        quantiles (bool): Построить скетчи квантилей зарплат по годам и городам
+
+    Returns:
+        VacancyStatistics: Статистика по вакансиям
+    """
+    statistics = VacancyStatistics(professions, quantiles=quantiles)
+    salary = table.average_salary(currency_to_rub)
+
+    years, first_index, year_keys = np.unique(table.published_at, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind='stable')
+    years = years[order].tolist()
+    year_counts = np.bincount(year_keys, minlength=len(order))[order]
+    year_sums = grouped_sum(year_keys, salary, len(order))[order]
+    statistics.years = SalaryAccumulator(zip(years, year_sums.tolist(), year_counts.tolist()))
+
+    if index is not None:
+        for profession in statistics.professions:
+            statistics.profession_years[profession] = aggregate_rows(table, index.rows(profession), currency_to_rub)
+    else:
+        for profession, matched in profession_masks(table, statistics):
+            profession_counts = np.bincount(year_keys[matched], minlength=len(order))[order]
+            profession_sums = grouped_sum(year_keys[matched], salary[matched], len(order))[order]
+            statistics.profession_years[profession] = SalaryAccumulator(
+                (year, salary_sum, count) for year, salary_sum, count
+                in zip(years, profession_sums.tolist(), profession_counts.tolist()) if count)
+
+    city_counts = np.bincount(table.area_id, minlength=len(table.cities))
+    city_sums = grouped_sum(table.area_id, salary, len(table.cities))
+    present = np.flatnonzero(city_counts)
+    statistics.cities = SalaryAccumulator(zip([table.cities[i] for i in present.tolist()],
+                                              city_sums[present].tolist(), city_counts[present].tolist()))
+
+    if quantiles:
+        year_sketches = grouped_sketches(year_keys, salary, len(order))
+        statistics.year_sketches = {year: year_sketches[key] for year, key in zip(years, order.tolist())}
+        city_sketches = grouped_sketches(table.area_id, salary, len(table.cities))
+        statistics.city_sketches = {table.cities[i]: city_sketches[i] for i in present.tolist()}
+    return statistics
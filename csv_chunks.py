@@ -0,0 +1,128 @@
+import csv
+import os
+
+
+def read_title(file_name: str, encoding: str = 'utf-8-sig') -> tuple:
+    """Читает заголовок csv файла
+
+    Args:
+        file_name (str): Название файла
+        encoding (str): Кодировка файла
+
+    Returns:
+        tuple: Список названий столбцов и смещение в байтах, с которого начинаются записи
+    """
+    with open(file_name, 'rb') as file:
+        line = file.readline()
+    return next(csv.reader([line.decode(encoding)])), len(line)
+
+
+def find_record_boundaries(file_name: str, parts: int, start: int = 0, block_size: int = 1 << 20) -> list:
+    """Делит файл на части примерно равного размера по границам записей
+
+    Граница ставится только после перевода строки вне кавычек, поэтому многострочные поля в кавычках
+    не разрезаются. Признак "внутри кавычек" определяется по четности числа кавычек от начала файла,
+    удвоенные кавычки внутри поля четность не меняют. Файл читается блоками, целиком в память не загружается.
+
+    Args:
+        file_name (str): Название файла
+        parts (int): Желаемое количество частей
+        start (int): Смещение начала первой записи
+        block_size (int): Размер блока чтения в байтах
+
+    Returns:
+        list: Смещения границ частей, от start до размера файла включительно
+    """
+    size = os.path.getsize(file_name)
+    targets = [start + (size - start) * i // parts for i in range(1, parts)]
+    boundaries = [start]
+    target_index = 0
+    in_quotes = False
+    position = start
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        while target_index < len(targets):
+            block = file.read(block_size)
+            if not block:
+                break
+            scanned = 0
+            while target_index < len(targets) and targets[target_index] - position < len(block):
+                newline = block.find(b'\n', max(targets[target_index] - position, scanned))
+                if newline == -1:
+                    break
+                in_quotes ^= bool(block.count(b'"', scanned, newline) & 1)
+                scanned = newline + 1
+                if not in_quotes:
+                    boundaries.append(position + scanned)
+                    while target_index < len(targets) and targets[target_index] < boundaries[-1]:
+                        target_index += 1
+            in_quotes ^= bool(block.count(b'"', scanned) & 1)
+            position += len(block)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return boundaries
+
+
+def read_records(file_name: str, start: int, end: int, encoding: str = 'utf-8'):
+    """Построчно разбирает записи csv файла из диапазона байт [start, end)
+
+    Переводы строк приводятся к '\\n', как при чтении файла в текстовом режиме
+
+    Args:
+        file_name (str): Название файла
+        start (int): Смещение начала диапазона, должно совпадать с границей записи
+        end (int): Смещение конца диапазона
+        encoding (str): Кодировка файла
+
+    Yields:
+        list: Значения полей записи
+    """
+    def lines():
+        position = start
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        yield from csv.reader(lines())
+
+
+def find_last_record_end(file_name: str, start: int = 0, block_size: int = 1 << 20) -> int:
+    """Находит конец последней полностью записанной записи файла, начиная со смещения start
+
+    Запись считается законченной, если после нее стоит перевод строки вне кавычек. Недописанный
+    хвост файла, например строка, которую еще дописывает другой процесс, не учитывается
+
+    Args:
+        file_name (str): Название файла
+        start (int): Смещение, с которого начинается поиск, должно совпадать с границей записи
+        block_size (int): Размер блока чтения в байтах
+
+    Returns:
+        int: Смещение сразу после последней законченной записи или start, если таких записей нет
+    """
+    blocks = []
+    in_quotes = False
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        position = start
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            blocks.append((position, in_quotes))
+            in_quotes ^= bool(block.count(b'"') & 1)
+            position += len(block)
+        for block_start, block_in_quotes in reversed(blocks):
+            file.seek(block_start)
+            block = file.read(block_size)
+            newline = block.rfind(b'\n')
+            while newline != -1:
+                if not block_in_quotes ^ bool(block.count(b'"', 0, newline) & 1):
+                    return block_start + newline + 1
+                newline = block.rfind(b'\n', 0, newline)
+    return start
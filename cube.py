@@ -0,0 +1,167 @@
+import numpy as np
+
+from aggregates import SalaryAccumulator, VacancyStatistics
+from aggregation import grouped_sum
+
+
+CUBE_COLUMNS = ('year', 'city', 'currency', 'bucket', 'sums', 'counts')
+
+
+class SalaryCube:
+    """Предрассчитанный куб сумм и количеств зарплат по измерениям (год, город, валюта, профессии)
+
+    Каждая ячейка куба - непустое сочетание измерений. Профессии хранятся корзинами: корзина - набор профессий,
+    найденных в названии вакансии, поэтому одна вакансия попадает ровно в одну ячейку, даже если подходит
+    к нескольким профессиям. Ячеек на порядки меньше, чем вакансий, и любая статистика DataSet
+    собирается из них групповыми суммами
+
+    Attributes:
+        years (list): Годы в порядке первого появления в файле
+        cities (list): Города в порядке первого появления в файле
+        currencies (list): Валюты
+        professions (tuple): Профессии, для которых построены корзины
+        buckets (list): Корзины: кортежи номеров профессий
+        year (np.ndarray): Номер года ячейки в years
+        city (np.ndarray): Номер города ячейки в cities
+        currency (np.ndarray): Номер валюты ячейки в currencies
+        bucket (np.ndarray): Номер корзины профессий ячейки в buckets
+        sums (np.ndarray): Суммы зарплат в рублях
+        counts (np.ndarray): Количества вакансий
+    """
+    def __init__(self, years: list, cities: list, currencies: list, professions, buckets: list,
+                 year: np.ndarray, city: np.ndarray, currency: np.ndarray, bucket: np.ndarray,
+                 sums: np.ndarray, counts: np.ndarray):
+        """Инициализирует объект SalaryCube из готовых словарей измерений и колонок ячеек
+
+        Args:
+            years (list): Годы
+            cities (list): Города
+            currencies (list): Валюты
+            professions (iterable): Профессии
+            buckets (list): Корзины профессий
+            year (np.ndarray): Номера годов ячеек
+            city (np.ndarray): Номера городов ячеек
+            currency (np.ndarray): Номера валют ячеек
+            bucket (np.ndarray): Номера корзин ячеек
+            sums (np.ndarray): Суммы зарплат ячеек
+            counts (np.ndarray): Количества вакансий ячеек
+        """
+        self.years = years
+        self.cities = cities
+        self.currencies = currencies
+        self.professions = tuple(professions)
+        self.buckets = [tuple(bucket_professions) for bucket_professions in buckets]
+        self.year = year
+        self.city = city
+        self.currency = currency
+        self.bucket = bucket
+        self.sums = sums
+        self.counts = counts
+
+    @classmethod
+    def build(cls, table, professions, currency_to_rub: dict) -> 'SalaryCube':
+        """Строит куб по колоночной таблице за одну сортировку ключей ячеек
+
+        Args:
+            table (VacancyTable): Колоночная таблица вакансий
+            professions (str or iterable): Название профессии или список названий
+            currency_to_rub (dict): Курсы валют к рублю
+
+        Returns:
+            SalaryCube: Куб
+
+        >>> from vacancy_table import VacancyTable, CURRENCIES
+        >>> rows = [{'name': name, 'salary_from': '100', 'salary_to': '100', 'salary_currency': 'RUR', 'area_name': 'Пермь', 'published_at': '2022'} for name in ('Аналитик', 'Программист', 'Аналитик')]
+        >>> cube = SalaryCube.build(VacancyTable.from_rows(rows), ['Аналитик'], dict.fromkeys(CURRENCIES, 1))
+        >>> cube.buckets, cube.counts.tolist()
+        ([(0,), ()], [2, 1])
+        """
+        statistics = VacancyStatistics(professions)
+        bucket_ids = {}
+        name_bucket = np.array([bucket_ids.setdefault(statistics.match(name), len(bucket_ids))
+                                for name in table.names], dtype=np.int64)
+        years, first_index, year_keys = np.unique(table.published_at, return_index=True, return_inverse=True)
+        order = np.argsort(first_index, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        year_keys = rank[year_keys]
+
+        shape = (len(years), max(len(table.cities), 1), max(len(table.currencies), 1), max(len(bucket_ids), 1))
+        keys = np.ravel_multi_index((year_keys, table.area_id, table.salary_currency,
+                                     name_bucket[table.name_id] if len(bucket_ids) else 0), shape)
+        cells, cell_keys = np.unique(keys, return_inverse=True)
+        counts = np.bincount(cell_keys, minlength=len(cells))
+        sums = grouped_sum(cell_keys, table.average_salary(currency_to_rub), len(cells))
+        year, city, currency, bucket = np.unravel_index(cells, shape)
+        return cls(years[order].tolist(), list(table.cities), list(table.currencies), statistics.professions,
+                   list(bucket_ids), year.astype(np.int16), city.astype(np.int32), currency.astype(np.uint8),
+                   bucket.astype(np.int32), sums.astype(np.int64), counts.astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def covers(self, professions) -> bool:
+        """Проверяет, что профессии есть в измерении профессий куба
+
+        Args:
+            professions (str or iterable): Название профессии или список названий
+
+        Returns:
+            bool: Можно ли ответить на запрос по кубу
+        """
+        professions = [professions] if isinstance(professions, str) else professions
+        return all(profession in self.professions for profession in professions)
+
+    def cell_mask(self, currencies=None) -> np.ndarray:
+        """Отбирает ячейки по валютам
+
+        Args:
+            currencies (iterable): Валюты или None для всех ячеек
+
+        Returns:
+            np.ndarray: Маска ячеек
+        """
+        if currencies is None:
+            return np.ones(len(self), dtype=bool)
+        wanted = [index for index, currency in enumerate(self.currencies) if currency in currencies]
+        return np.isin(self.currency, wanted)
+
+    def series(self, keys: np.ndarray, labels: list, mask: np.ndarray) -> SalaryAccumulator:
+        """Сворачивает ячейки по одному измерению
+
+        Args:
+            keys (np.ndarray): Номера значений измерения для каждой ячейки
+            labels (list): Значения измерения
+            mask (np.ndarray): Учитываемые ячейки
+
+        Returns:
+            SalaryAccumulator: Суммы и количества в порядке labels, пустые значения пропускаются
+        """
+        counts = grouped_sum(keys[mask], self.counts[mask], len(labels))
+        sums = grouped_sum(keys[mask], self.sums[mask], len(labels))
+        present = np.flatnonzero(counts)
+        return SalaryAccumulator(zip([labels[i] for i in present.tolist()], sums[present].tolist(),
+                                     counts[present].tolist()))
+
+    def statistics(self, professions, currencies=None) -> VacancyStatistics:
+        """Собирает статистику DataSet из ячеек куба, не обращаясь к исходному файлу
+
+        Args:
+            professions (str or iterable): Название профессии или список названий, все должны быть в кубе
+            currencies (iterable): Учитывать только вакансии с окладом в этих валютах
+
+        Returns:
+            VacancyStatistics: Статистика по вакансиям
+        """
+        statistics = VacancyStatistics(professions)
+        if not self.covers(statistics.professions):
+            raise KeyError(f'Профессий {statistics.professions} нет в кубе профессий {self.professions}')
+        mask = self.cell_mask(currencies)
+        statistics.years = self.series(self.year, self.years, mask)
+        for profession in statistics.professions:
+            index = self.professions.index(profession)
+            in_bucket = np.array([index in bucket for bucket in self.buckets], dtype=bool)
+            statistics.profession_years[profession] = self.series(self.year, self.years,
+                                                                  mask & in_bucket[self.bucket])
+        statistics.cities = self.series(self.city, self.cities, mask)
+        return statistics
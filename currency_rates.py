@@ -0,0 +1,194 @@
+import csv
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+from dates import month_ordinal
+
+
+class RateTable:
+    """Исторические курсы валют к рублю по месяцам
+
+    Курсы хранятся плотной матрицей (валюта, месяц) от первого до последнего месяца источника. Пропущенные
+    месяцы заполняются последним известным курсом, месяцы до начала источника - первым. Для валют, которых
+    нет в источнике, используются курсы по умолчанию (обычно статический словарь currency_to_rub)
+
+    Attributes:
+        currencies (list): Валюты источника
+        start_month (int): Номер первого месяца матрицы (год * 12 + месяц - 1)
+        matrix (np.ndarray): Курсы, float64, размер (len(currencies), количество месяцев)
+        defaults (dict): Курсы по умолчанию для валют, которых нет в источнике
+        lookups (dict): Запомненные результаты rate
+    """
+    def __init__(self, currencies: list, start_month: int, matrix: np.ndarray, defaults: dict = None):
+        """Инициализирует объект RateTable
+
+        Args:
+            currencies (list): Валюты
+            start_month (int): Номер первого месяца матрицы
+            matrix (np.ndarray): Курсы по валютам и месяцам
+            defaults (dict): Курсы по умолчанию
+        """
+        self.currencies = currencies
+        self.start_month = start_month
+        self.matrix = matrix
+        self.defaults = dict(defaults or {})
+        self.defaults.setdefault('RUR', 1)
+        self.lookups = {}
+
+    @classmethod
+    def from_observations(cls, observations, defaults: dict = None) -> 'RateTable':
+        """Строит таблицу из наблюдений курса. Курс месяца - среднее всех наблюдений за месяц
+
+        Args:
+            observations (iterable): Тройки (валюта, номер месяца, курс за одну единицу валюты)
+            defaults (dict): Курсы по умолчанию
+
+        Returns:
+            RateTable: Таблица курсов
+
+        >>> rates = RateTable.from_observations([('USD', 24264, 60.0), ('USD', 24264, 62.0), ('USD', 24266, 70.0)])
+        >>> rates.rate('USD', 24263), rates.rate('USD', 24265), rates.rate('USD', 24300), rates.rate('RUR', 24265)
+        (61.0, 61.0, 70.0, 1)
+        """
+        sums, counts = {}, {}
+        for currency, month, rate in observations:
+            key = currency, month
+            sums[key] = sums.get(key, 0) + rate
+            counts[key] = counts.get(key, 0) + 1
+        currencies = list(dict.fromkeys(currency for currency, _ in sums))
+        if not sums:
+            return cls([], 0, np.zeros((0, 1)), defaults)
+        months = [month for _, month in sums]
+        start_month, end_month = min(months), max(months)
+        matrix = np.full((len(currencies), end_month - start_month + 1), np.nan)
+        for (currency, month), rate_sum in sums.items():
+            matrix[currencies.index(currency), month - start_month] = rate_sum / counts[currency, month]
+        for row in matrix:
+            known = np.flatnonzero(~np.isnan(row))
+            row[:] = row[known[np.clip(np.searchsorted(known, np.arange(len(row)), side='right') - 1, 0, None)]]
+        return cls(currencies, start_month, matrix, defaults)
+
+    @classmethod
+    def from_csv(cls, file_name: str, defaults: dict = None) -> 'RateTable':
+        """Загружает курсы из csv файла со столбцами date (ГГГГ-ММ или ГГГГ-ММ-ДД), currency, rate
+        и необязательным nominal (за сколько единиц валюты указан курс)
+
+        Args:
+            file_name (str): Название файла
+            defaults (dict): Курсы по умолчанию
+
+        Returns:
+            RateTable: Таблица курсов
+        """
+        with open(file_name, encoding='utf-8-sig', newline='') as file:
+            observations = [(row['currency'], month_ordinal(row['date']),
+                             float(row['rate'].replace(',', '.')) / float(row.get('nominal') or 1))
+                            for row in csv.DictReader(file)]
+        return cls.from_observations(observations, defaults)
+
+    @classmethod
+    def from_cbr_xml(cls, file_names, defaults: dict = None) -> 'RateTable':
+        """Загружает курсы из сохраненных ежедневных выгрузок ЦБ РФ (XML_daily.asp): элементы ValCurs с датой
+        вида ДД.ММ.ГГГГ и вложенными Valute (CharCode, Nominal, Value с десятичной запятой).
+        Файл может содержать один ValCurs или несколько внутри общего корневого элемента
+
+        Args:
+            file_names (str or list): Файл или список файлов
+            defaults (dict): Курсы по умолчанию
+
+        Returns:
+            RateTable: Таблица курсов
+        """
+        observations = []
+        for file_name in [file_names] if isinstance(file_names, str) else file_names:
+            root = ElementTree.parse(file_name).getroot()
+            for rates in [root] if root.tag == 'ValCurs' else root.iter('ValCurs'):
+                day, month, year = rates.get('Date').split('.')
+                for valute in rates.iter('Valute'):
+                    rate = float(valute.findtext('Value').replace(',', '.')) / float(valute.findtext('Nominal'))
+                    observations.append((valute.findtext('CharCode'), int(year) * 12 + int(month) - 1, rate))
+        return cls.from_observations(observations, defaults)
+
+    def rate(self, currency: str, month: int) -> float:
+        """Возвращает курс валюты за месяц, результат запоминается
+
+        Args:
+            currency (str): Валюта
+            month (int): Номер месяца (год * 12 + месяц - 1)
+
+        Returns:
+            float: Курс к рублю
+        """
+        key = currency, month
+        if key not in self.lookups:
+            if currency in self.currencies:
+                column = min(max(month - self.start_month, 0), self.matrix.shape[1] - 1)
+                self.lookups[key] = float(self.matrix[self.currencies.index(currency), column])
+            else:
+                self.lookups[key] = self.defaults[currency]
+        return self.lookups[key]
+
+    def fingerprint(self) -> str:
+        """Хеширует курсы таблицы. По хешу сохраненные результаты, посчитанные по одним курсам, отличаются
+        от результатов по другим
+
+        Returns:
+            str: Хеш валют, месяцев, курсов и курсов по умолчанию
+
+        >>> RateTable(['USD'], 24264, np.array([[60.0]])).fingerprint() == RateTable(['USD'], 24264, np.array([[61.0]])).fingerprint()
+        False
+        """
+        digest = hashlib.blake2b(json.dumps([self.currencies, self.start_month, sorted(self.defaults.items())],
+                                            ensure_ascii=False).encode(), digest_size=16)
+        digest.update(np.ascontiguousarray(self.matrix, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def rate_array(self, currencies: list, currency_ids: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """Векторно находит курсы для массивов кодов валют и номеров месяцев
+
+        Args:
+            currencies (list): Словарь валют, на который ссылаются коды
+            currency_ids (np.ndarray): Коды валют
+            months (np.ndarray): Номера месяцев
+
+        Returns:
+            np.ndarray: Курсы к рублю, float64
+        """
+        extended = np.vstack([self.matrix] + [np.full((1, self.matrix.shape[1]), float(self.defaults[currency]))
+                                              for currency in currencies if currency not in self.currencies])
+        rows, default_row = [], len(self.currencies)
+        for currency in currencies:
+            if currency in self.currencies:
+                rows.append(self.currencies.index(currency))
+            else:
+                rows.append(default_row)
+                default_row += 1
+        columns = np.clip(np.asarray(months, dtype=np.int64) - self.start_month, 0, self.matrix.shape[1] - 1)
+        return extended[np.array(rows, dtype=np.int64)[currency_ids], columns]
+
+
+rate_tables = {}
+
+
+def load_rates(file_name: str, defaults: dict = None) -> RateTable:
+    """Загружает таблицу курсов из csv или xml файла, повторные загрузки неизменного файла берутся из памяти
+
+    Args:
+        file_name (str): Название файла
+        defaults (dict): Курсы по умолчанию
+
+    Returns:
+        RateTable: Таблица курсов
+    """
+    stat = os.stat(file_name)
+    key = os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns, tuple(sorted((defaults or {}).items()))
+    if key not in rate_tables:
+        if file_name.lower().endswith('.xml'):
+            rate_tables[key] = RateTable.from_cbr_xml(file_name, defaults)
+        else:
+            rate_tables[key] = RateTable.from_csv(file_name, defaults)
+    return rate_tables[key]
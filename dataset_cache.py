@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from vacancy_table import VacancyTable
+from name_index import NameIndex
+from cube import SalaryCube, CUBE_COLUMNS
+
+
+CACHE_VERSION = 2
+COLUMNS = ('salary_from', 'salary_to', 'salary_currency', 'published_at', 'area_id', 'name_id',
+           'published_month')
+SAMPLE_SIZE = 1 << 20
+
+
+def file_fingerprint(file_name: str) -> dict:
+    """Создает отпечаток файла: путь, размер, время изменения и хеш содержимого
+
+    Хешируются размер и три блока файла (начало, середина, конец), поэтому отпечаток
+    многогигабайтного файла считается за миллисекунды
+
+    Args:
+        file_name (str): Название файла
+
+    Returns:
+        dict: Отпечаток файла
+    """
+    stat = os.stat(file_name)
+    digest = hashlib.blake2b(str(stat.st_size).encode(), digest_size=16)
+    with open(file_name, 'rb') as file:
+        for offset in sorted({0, max(stat.st_size // 2 - SAMPLE_SIZE // 2, 0), max(stat.st_size - SAMPLE_SIZE, 0)}):
+            file.seek(offset)
+            digest.update(file.read(SAMPLE_SIZE))
+    return {'path': os.path.abspath(file_name), 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+            'hash': digest.hexdigest(), 'version': CACHE_VERSION}
+
+
+def cache_directory(file_name: str, cache_dir: str) -> str:
+    """Возвращает папку кеша для файла
+
+    Args:
+        file_name (str): Название файла
+        cache_dir (str): Корневая папка кеша
+
+    Returns:
+        str: Путь к папке кеша этого файла
+    """
+    key = hashlib.blake2b(os.path.abspath(file_name).encode(), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def save_table(table: VacancyTable, file_name: str, cache_dir: str):
+    """Сохраняет колонки таблицы в .npy файлы, а словари и отпечаток исходного файла в json
+
+    Отпечаток записывается последним, поэтому прерванная запись не даст считать неполный кеш
+
+    Args:
+        table (VacancyTable): Колоночная таблица вакансий
+        file_name (str): Исходный csv файл
+        cache_dir (str): Корневая папка кеша
+    """
+    directory = cache_directory(file_name, cache_dir)
+    os.makedirs(directory, exist_ok=True)
+    meta_file = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    for column in COLUMNS:
+        np.save(os.path.join(directory, f'{column}.npy'), getattr(table, column))
+    with open(os.path.join(directory, 'dictionaries.json'), 'w', encoding='utf-8') as file:
+        json.dump({'currencies': table.currencies, 'cities': table.cities, 'names': table.names}, file,
+                  ensure_ascii=False)
+    with open(meta_file, 'w', encoding='utf-8') as file:
+        json.dump(file_fingerprint(file_name), file)
+
+
+def load_table(file_name: str, cache_dir: str):
+    """Загружает таблицу из кеша, если исходный файл не менялся. Колонки отображаются в память
+
+    Args:
+        file_name (str): Исходный csv файл
+        cache_dir (str): Корневая папка кеша
+
+    Returns:
+        VacancyTable or None: Таблица из кеша или None, если кеша нет или он устарел
+    """
+    directory = cache_directory(file_name, cache_dir)
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta != file_fingerprint(file_name):
+        return None
+    with open(os.path.join(directory, 'dictionaries.json'), encoding='utf-8') as file:
+        dictionaries = json.load(file)
+    columns = {column: np.load(os.path.join(directory, f'{column}.npy'), mmap_mode='r') for column in COLUMNS}
+    published_month = columns.pop('published_month')
+    return VacancyTable(*columns.values(), dictionaries['currencies'], dictionaries['cities'], dictionaries['names'],
+                        published_month)
+
+
+def cached_table(file_name: str, build, cache_dir: str = '.vacancy_cache') -> VacancyTable:
+    """Возвращает таблицу из кеша или строит ее и сохраняет в кеш
+
+    Args:
+        file_name (str): Исходный csv файл
+        build (callable): Функция без аргументов, которая строит VacancyTable из исходного файла
+        cache_dir (str): Корневая папка кеша
+
+    Returns:
+        VacancyTable: Колоночная таблица вакансий
+    """
+    table = load_table(file_name, cache_dir)
+    if table is None:
+        table = build()
+        save_table(table, file_name, cache_dir)
+    return table
+
+
+def cached_index(file_name: str, build, cache_dir: str = '.vacancy_cache') -> NameIndex:
+    """Возвращает индекс названий вакансий из кеша или строит его и сохраняет в кеш
+
+    Индекс хранится рядом с колоночной таблицей и проверяется по тому же отпечатку исходного файла
+
+    Args:
+        file_name (str): Исходный csv файл
+        build (callable): Функция без аргументов, которая строит NameIndex
+        cache_dir (str): Корневая папка кеша
+
+    Returns:
+        NameIndex: Индекс названий вакансий
+    """
+    directory = os.path.join(cache_directory(file_name, cache_dir), 'name_index')
+    meta_file = os.path.join(directory, 'meta.json')
+    try:
+        with open(meta_file, encoding='utf-8') as file:
+            if json.load(file) == file_fingerprint(file_name):
+                return NameIndex.load(directory)
+    except (OSError, ValueError):
+        pass
+    index = build()
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    index.save(directory)
+    with open(meta_file, 'w', encoding='utf-8') as file:
+        json.dump(file_fingerprint(file_name), file)
+    return index
+
+
+def save_cube(cube: SalaryCube, file_name: str, cache_dir: str):
+    """Сохраняет куб в папку кеша файла: колонки ячеек в .npy, измерения и отпечаток исходного файла в json
+
+    Args:
+        cube (SalaryCube): Куб
+        file_name (str): Исходный csv файл
+        cache_dir (str): Корневая папка кеша
+    """
+    directory = os.path.join(cache_directory(file_name, cache_dir), 'cube')
+    os.makedirs(directory, exist_ok=True)
+    meta_file = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    for column in CUBE_COLUMNS:
+        np.save(os.path.join(directory, f'{column}.npy'), getattr(cube, column))
+    with open(os.path.join(directory, 'dimensions.json'), 'w', encoding='utf-8') as file:
+        json.dump({'years': cube.years, 'cities': cube.cities, 'currencies': cube.currencies,
+                   'professions': list(cube.professions), 'buckets': cube.buckets}, file, ensure_ascii=False)
+    with open(meta_file, 'w', encoding='utf-8') as file:
+        json.dump(file_fingerprint(file_name), file)
+
+
+def load_cube(file_name: str, cache_dir: str):
+    """Загружает куб из кеша, если исходный файл не менялся
+
+    Args:
+        file_name (str): Исходный csv файл
+        cache_dir (str): Корневая папка кеша
+
+    Returns:
+        SalaryCube or None: Куб или None, если куба нет или он устарел
+    """
+    directory = os.path.join(cache_directory(file_name, cache_dir), 'cube')
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta != file_fingerprint(file_name):
+        return None
+    with open(os.path.join(directory, 'dimensions.json'), encoding='utf-8') as file:
+        dimensions = json.load(file)
+    columns = [np.load(os.path.join(directory, f'{column}.npy')) for column in CUBE_COLUMNS]
+    return SalaryCube(dimensions['years'], dimensions['cities'], dimensions['currencies'],
+                      dimensions['professions'], dimensions['buckets'], *columns)
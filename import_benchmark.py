@@ -0,0 +1,129 @@
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+
+
+BACKEND_MODULES = ('matplotlib', 'openpyxl', 'jinja2', 'pdfkit')
+COLUMNAR_MODULES = ('numpy',)
+STARTUP_LIMIT_MS = 200
+STARTUP_MARGIN = 4
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Запускает код в новом интерпретаторе из папки модулей проекта
+
+    Args:
+        code (str): Код для python -c
+        options (str): Параметры интерпретатора, например '-X', 'importtime'
+
+    Returns:
+        CompletedProcess: Результат запуска с выводом в виде строк
+    """
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True, check=True)
+
+
+def import_times(module: str) -> dict:
+    """Разбирает вывод python -X importtime при импорте модуля
+
+    Args:
+        module (str): Название модуля
+
+    Returns:
+        dict: Суммарное время импорта в микросекундах по названиям всех загруженных модулей
+    """
+    times = {}
+    for line in run_python(f'import {module}', '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def loaded_backends(module: str, names: tuple = BACKEND_MODULES, code: str = '') -> list:
+    """Проверяет, какие библиотеки вывода загружаются вместе с модулем
+
+    Args:
+        module (str): Название модуля
+        names (tuple): Проверяемые библиотеки, по умолчанию BACKEND_MODULES
+        code (str): Код, который выполняется после импорта, например подсчет статистики как в CLI
+
+    Returns:
+        list: Загруженные модули из names
+    """
+    return run_python(f'import sys, {module}\n{code}\n'
+                      f'print(*(name for name in {names!r} if name in sys.modules))').stdout.split()
+
+
+def cli_statistics_code(file_name: str, profession: str) -> str:
+    """Возвращает код, который выполняет CLI main.py с параметрами по умолчанию до вывода статистики
+
+    Args:
+        file_name (str): Файл вакансий
+        profession (str): Название профессии
+
+    Returns:
+        str: Код для startup_ms и loaded_backends
+    """
+    return f'import main\nmain.InputConect({file_name!r}, {profession!r})'
+
+
+def write_sample(file_name: str, rows: int = 200):
+    """Записывает небольшой файл вакансий для замера старта CLI
+
+    Args:
+        file_name (str): Название файла
+        rows (int): Количество вакансий
+    """
+    with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'])
+        writer.writerows([('Аналитик' if i % 3 else 'Программист', f'{20000 + i}.0', f'{30000 + i}.0', 'RUR',
+                           f'Город {i % 7}', f'{2010 + i % 12}-07-05T18:19:30+0300') for i in range(rows)])
+
+
+def startup_ms(code: str, repeat: int = 5) -> float:
+    """Измеряет время выполнения кода в только что запущенном интерпретаторе, без запуска самого интерпретатора
+
+    Args:
+        code (str): Код, обычно импорт модуля
+        repeat (int): Количество запусков, берется лучший
+
+    Returns:
+        float: Время в миллисекундах
+    """
+    program = f'import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)'
+    return min(float(run_python(program).stdout) for _ in range(repeat)) * 1000
+
+
+if __name__ == '__main__':
+    for entry_point in 'main', 'task232':
+        times = import_times(entry_point)
+        heavy = {name: time for name, time in times.items() if name in BACKEND_MODULES + COLUMNAR_MODULES}
+        print(f'{entry_point}: import {times[entry_point] / 1000:.1f} мс (-X importtime), '
+              f'{startup_ms(f"import {entry_point}"):.1f} мс по часам, '
+              f'библиотеки вывода: {", ".join(loaded_backends(entry_point)) or "не загружаются"}, '
+              f'numpy: {"загружается" if loaded_backends(entry_point, COLUMNAR_MODULES) else "не загружается"}')
+        for name, time in sorted(times.items(), key=lambda item: -item[1])[1:6]:
+            print(f'{name:>30}: {time / 1000:7.1f} мс')
+        assert not heavy, f'{entry_point} загружает {sorted(heavy)} при старте'
+    for name in 'numpy', 'matplotlib.pyplot', 'openpyxl', 'jinja2', 'pdfkit':
+        try:
+            print(f'{name:>30}: {startup_ms(f"import {name}"):7.1f} мс, загружается только в своем режиме')
+        except subprocess.CalledProcessError:
+            print(f'{name:>30}: не установлен')
+    with tempfile.TemporaryDirectory() as directory:
+        sample = os.path.join(directory, 'vacancies.csv')
+        write_sample(sample)
+        cli = cli_statistics_code(sample, 'Аналитик')
+        stats = startup_ms(cli)
+        loaded = loaded_backends('main', BACKEND_MODULES + COLUMNAR_MODULES, cli)
+    budget = STARTUP_LIMIT_MS / STARTUP_MARGIN
+    print(f'CLI до вывода статистики (import main и подсчет 200 вакансий): {stats:.1f} мс, '
+          f'предел {STARTUP_LIMIT_MS} мс, с запасом в {STARTUP_MARGIN} раза не больше {budget:.0f} мс')
+    assert not loaded, f'CLI загружает {loaded} до вывода статистики'
+    assert stats < budget, f'CLI выводит статистику через {stats:.1f} мс, запас до предела {STARTUP_LIMIT_MS} мс исчерпан'
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+
+from aggregates import VacancyStatistics
+
+
+DIGEST_SIZE = 1 << 16
+
+
+def prefix_digest(file_name: str, offset: int) -> str:
+    """Хеширует заголовок файла и последние байты перед смещением offset
+
+    По этому хешу при следующем запуске проверяется, что уже обработанная часть файла не была переписана
+
+    Args:
+        file_name (str): Название файла
+        offset (int): Смещение конца обработанной части
+
+    Returns:
+        str: Хеш
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as file:
+        digest.update(file.readline())
+        file.seek(max(offset - DIGEST_SIZE, 0))
+        digest.update(file.read(offset - file.tell()))
+    return digest.hexdigest()
+
+
+def load_state(state_file: str, file_name: str, professions: list, quantiles: bool = False,
+               city_capacity: int = None, rates: str = None):
+    """Загружает сохраненное состояние предыдущего запуска, если оно подходит к текущему файлу
+
+    Состояние отбрасывается, если оно получено для другого файла, списка профессий или с другими настройками
+    подсчета (квантили, приближенный подсчет городов, курсы валют), если файл стал короче обработанной части или эта часть
+    изменилась
+
+    Args:
+        state_file (str): Файл состояния
+        file_name (str): Название файла вакансий
+        professions (list): Названия профессий
+        quantiles (bool): Рассчитываются ли квантили зарплат
+        city_capacity (int): Количество хранимых городов или None для точного подсчета
+        rates (str): Хеш исторических курсов валют (RateTable.fingerprint) или None для постоянных курсов
+
+    Returns:
+        dict or None: Смещение обработанной части ('offset') и накопленная статистика ('statistics')
+    """
+    try:
+        with open(state_file, encoding='utf-8') as file:
+            state = json.load(file)
+        if (state['path'] != os.path.abspath(file_name) or state['professions'] != professions
+                or state['quantiles'] != quantiles or state['city_capacity'] != city_capacity
+                or state['rates'] != rates
+                or os.path.getsize(file_name) < state['offset']
+                or prefix_digest(file_name, state['offset']) != state['digest']):
+            return None
+        return {'offset': state['offset'], 'statistics': VacancyStatistics.from_dict(state['statistics'])}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_state(state_file: str, file_name: str, professions: list, offset: int, statistics: VacancyStatistics,
+               quantiles: bool = False, city_capacity: int = None, rates: str = None):
+    """Сохраняет смещение обработанной части файла и накопленные суммы и количества
+
+    Args:
+        state_file (str): Файл состояния
+        file_name (str): Название файла вакансий
+        professions (list): Названия профессий
+        offset (int): Смещение конца обработанной части
+        statistics (VacancyStatistics): Накопленная статистика
+        quantiles (bool): Рассчитываются ли квантили зарплат
+        city_capacity (int): Количество хранимых городов или None для точного подсчета
+        rates (str): Хеш исторических курсов валют (RateTable.fingerprint) или None для постоянных курсов
+    """
+    state = {'path': os.path.abspath(file_name), 'professions': professions, 'quantiles': quantiles,
+             'city_capacity': city_capacity, 'rates': rates, 'offset': offset, 'digest': prefix_digest(file_name, offset), 'statistics': statistics.to_dict()}
+    temporary_file = state_file + '.tmp'
+    with open(temporary_file, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temporary_file, state_file)
@@ -1,17 +1,27 @@
+import base64
 import csv
+import io
+import os
 import re
-import pdfkit
-from jinja2 import Environment, FileSystemLoader
-import numpy as np
-from matplotlib import pyplot as plt
-from openpyxl import Workbook
-from openpyxl.styles import Side, Font, Border, Alignment
-from openpyxl.utils import get_column_letter
-import parse_csv
+from collections.abc import Mapping
+from itertools import zip_longest
+from itertools import repeat
+from csv_chunks import read_title, find_record_boundaries, read_records, find_last_record_end
+import incremental
+from aggregates import VacancyStatistics, SpaceSaving, top_items
+from quantiles import QUANTILES
+from dates import month_ordinal, period_label
+from report_model import ReportModel
 
 
 currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76, "KZT": 0.13, "RUR": 1,
                    "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
+vacancy_columns = ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at')
+report_templates = {}
+GRAPH_SIZE = (8.5, 6)
+GRAPH_LAYOUT = {'left': 0.15, 'right': 0.98, 'bottom': 0.09, 'top': 0.91, 'wspace': 0.19, 'hspace': 0.38}
+graph_figures = {}
+BATCH_EXCEL_POOL_PROFESSIONS = 5000
 
 
 class Report:
@@ -25,13 +35,18 @@ class Report:
         prof_count (dict): Количестве вакансий профессии за определенный год
         cities_salary (dict): Средние зарплаты в городе
         cities_procent (dict): Коэффицент отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
-        workbook (object): Рабочий файл эксель
+        salary_quantiles (dict): Квантили зарплат по годам для каждого квантиля из QUANTILES
+        city_quantiles (dict): Квантили зарплат по городам для каждого квантиля из QUANTILES
+        model (ReportModel): Выровненные данные отчета, по которым строятся pdf и excel
+        workbook (object): Рабочий файл эксель, создается в generate_excel
         sheet_years (object): Страница с таблицей информации по годам
         sheet_cities (object): Страница с таблицей информации по городам
     """
     def __init__(self, profession: str, vacancies_salary: dict, vacancies_count: dict, profes_salary: dict,
-                 profes_count: dict, cities_procent: dict, cities_data: dict):
-        """ Инициализирует объект Report, выполняет создание рабочей таблицы, создание страниц в таблице и присваивание страницам заголовки
+                 profes_count: dict, cities_procent: dict, cities_data: dict, salary_quantiles: dict = None,
+                 city_quantiles: dict = None, model: ReportModel = None):
+        """ Инициализирует объект Report. Рабочая таблица создается только в generate_excel, поэтому openpyxl
+        не загружается, если нужен только pdf
 
         Args:
             profession (str): Название профессии
@@ -41,6 +56,9 @@ class Report:
             profes_count (dict): Количестве вакансий профессии за определенный год
             cities_data (dict): Средние зарплаты в городе
             cities_procent (dict): Коэффицент отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
+            salary_quantiles (dict): Квантили зарплат по годам, см. DataSet.vacancies_quantiles
+            city_quantiles (dict): Квантили зарплат по городам, см. DataSet.city_quantiles
+            model (ReportModel): Готовые данные отчета, по умолчанию строятся из переданных словарей
 
         >>> type(Report('Программист', {2017: 20000}, {2017: 50}, {2017: 50000}, {2017: 5}, {'Москва': 0.56}, {'Москва': 10000})).__name__
         'Report'
@@ -66,28 +84,48 @@ class Report:
         self.prof_count = profes_count
         self.cities_salary = cities_data
         self.cities_procent = cities_procent
+        self.salary_quantiles = salary_quantiles or {}
+        self.city_quantiles = city_quantiles or {}
+        self.model = model or ReportModel.build(profession, vacancies_salary, vacancies_count, profes_salary,
+                                                profes_count, cities_procent, cities_data, salary_quantiles,
+                                                city_quantiles)
+        self.workbook = self.sheet_years = self.sheet_cities = None
+
+    def generate_pdf(self, file_name: str = 'out.pdf', backend: 'PdfBackend' = None, graph_src: str = None):
+        """Создает pdf файл, содержащий графики и таблицу с информацией о вакансиях и професии за разные года
 
-        self.workbook = Workbook()
-        self.sheet_years = self.workbook.active
-        self.sheet_years.title = 'Статистика по годам'
-        self.sheet_cities = self.workbook.create_sheet('Статистика по городам')
+        Args:
+            file_name (str): Название pdf файла
+            backend (PdfBackend): Способ создания pdf. Для пакета отчетов стоит передавать один объект,
+                чтобы его пул обработчиков переиспользовался, см. pdf_backends. По умолчанию wkhtmltopdf,
+                если он установлен, иначе создание средствами Python
+            graph_src (str): Адрес изображения с графиками, см. render_html
+        """
+        from pdf_backends import default_backend
 
-    def generate_pdf(self):
-        """Создает pdf файл, содержащий графики и таблицу с информацией о вакансиях и професии за разные года
+        if backend is not None:
+            backend.render(self.render_html(graph_src), file_name)
+            return
+        with default_backend(0) as backend:
+            backend.render(self.render_html(graph_src), file_name)
 
+    def render_html(self, graph_src: str = None) -> str:
+        """Заполняет html шаблон отчета данными из model
+
+        Args:
+            graph_src (str): Адрес изображения с графиками, обычно data URI из SetGraph.data_uri, чтобы графики
+                не записывались на диск. По умолчанию файл graph.png в текущей папке, см. SetGraph.create_graph
+
+        Returns:
+            str: html страница отчета
         """
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("template.html")
-        statistics = []
-        cities_procent = self.procent_format()
-        for i in range(len(self.vacancies_count.keys())):
-            statistics.append(self.__new_format_statistic(i))
-        columns = ['Год', 'Средняя зарплата', f'Средняя зарплата - {self.profession}',
-                   'Количество вакансий', f'Количество вакансий - {self.profession}']
-        pdf_template = template.render({'columns': columns, 'statistics': statistics, 'name': self.profession,
-                                        'cities_salary': self.cities_salary, 'cities_data': cities_procent})
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'out.pdf', configuration=config, options={'enable-local-file-access': ''})
+        if graph_src is None:
+            graph_src = 'file:///' + os.path.abspath('graph.png').replace('\\', '/').lstrip('/')
+        return report_template().render({'columns': self.year_columns(), 'statistics': self.model.year_rows(),
+                                         'name': self.profession, 'graph_src': graph_src,
+                                         'city_columns': self.model.city_columns(),
+                                         'cities_salary': self.model.city_salary_rows(),
+                                         'cities_data': self.procent_format()})
 
     def procent_format(self) -> dict:
         """Создает словарь, содержащий информацию о проценте отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
@@ -96,80 +134,289 @@ class Report:
             dict: Процент отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
 
         >>> Report('Программист', {2017: 20000}, {2017: 50}, {2017: 50000}, {2017: 5}, {'Москва': 0.56}, {'Москва': 10000}).procent_format()
-        {'Москва': 56%}
+        {'Москва': '56.0%'}
         """
-        return {city: f'{round(self.cities_procent[city] * 100, 2)}%' for city in self.cities_procent}
+        return dict(self.model.city_share_rows())
 
-    def __new_format_statistic(self, i: int) -> list:
-        """Создает список информации по вакансиям за год
-
-
-        Args:
-            i (int): Индекс интересующего года
+    def year_columns(self) -> list:
+        """Создает заголовки таблицы по годам
 
         Returns:
-            list: Список информации по вакансиям за год
-
+            list: Заголовки
         """
-        return [list(self.vacancies_salary.keys())[i], list(self.vacancies_salary.values())[i],
-                list(self.prof_salary.values())[i],
-                list(self.vacancies_count.values())[i], list(self.prof_count.values())[i]]
+        return ['Год', 'Средняя зарплата', f'Средняя зарплата - {self.profession}', 'Количество вакансий',
+                f'Количество вакансий - {self.profession}'] + self.model.quantile_titles()
 
-    def generate_excel(self):
+    def generate_excel(self, streaming: bool = False, charts: bool = False):
         """Создает excel файл с таблицами, содержащими информацию о вакансиях
+
+        Args:
+            streaming (bool): Записывать книгу в режиме write-only: строки сразу уходят в файл, ячейки ссылаются
+                на общие именованные стили, ширина столбцов считается по значениям до записи. Память не растет
+                с количеством строк, а файл совпадает по значениям, стилям и ширинам с обычным режимом
+            charts (bool): Добавить страницу 'Графики' с диаграммами excel тех же четырех графиков, что рисует
+                SetGraph. Диаграммы ссылаются на ячейки таблиц и строятся самим excel, без matplotlib
         """
-        self.sheet_years.append(
-            ('Год', 'Средняя зарплата', f'Средняя зарплата - {self.profession}', 'Количество вакансий',
-             f'Количество вакансий - {self.profession}'))
-        self.sheet_cities.append(('Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий'))
+        from openpyxl import Workbook
+
+        if streaming:
+            workbook = Workbook(write_only=True)
+            styles = self.report_styles(workbook)
+            sheet_years = self.write_sheet(workbook, 'Статистика по годам', self.year_rows, styles)
+            sheet_cities = self.write_sheet(workbook, 'Статистика по городам', self.city_rows, styles,
+                                            3 + len(self.model.city_columns()))
+            if charts:
+                self.add_charts(self.write_sheet(workbook, 'Графики', self.chart_rows, styles, 0), sheet_years,
+                                sheet_cities)
+            workbook.save('report.xlsx')
+            return
+        self.workbook = Workbook()
+        self.sheet_years = self.workbook.active
+        self.sheet_years.title = 'Статистика по годам'
+        self.sheet_cities = self.workbook.create_sheet('Статистика по городам')
+        self.sheet_years.append(self.year_columns())
+        self.sheet_cities.append((*self.model.city_columns(), '', 'Город', 'Доля вакансий'))
         self.filling_first_sheet()
         self.filling_second_sheet()
         self.sheet_formatting(self.sheet_years)
-        self.sheet_formatting(self.sheet_cities)
+        self.sheet_formatting(self.sheet_cities, 3 + len(self.model.city_columns()))
+        if charts:
+            sheet_charts = self.workbook.create_sheet('Графики')
+            for row in self.chart_rows():
+                sheet_charts.append(row)
+            self.sheet_formatting(sheet_charts, 0)
+            self.add_charts(sheet_charts, self.sheet_years, self.sheet_cities)
         self.workbook.save('report.xlsx')
 
+    def chart_rows(self):
+        """Создает строки страницы графиков вместе с заголовком: доли вакансий по городам числами
+        для круговой диаграммы
+
+        Yields:
+            tuple: Значения строки
+        """
+        yield 'Город', 'Доля вакансий'
+        yield from self.model.share_chart_rows()
+
+    def add_charts(self, sheet, sheet_years, sheet_cities):
+        """Размещает на странице сеткой 2x2 диаграммы excel, как на изображении SetGraph: зарплаты и количество
+        вакансий по годам, зарплаты по городам и доли вакансий по городам
+
+        Args:
+            sheet (Worksheet): Страница графиков, заполненная chart_rows
+            sheet_years (Worksheet): Страница статистики по годам
+            sheet_cities (Worksheet): Страница статистики по городам
+        """
+        from openpyxl.chart import LineChart, PieChart, Reference
+        from openpyxl.chart.label import DataLabelList
+
+        years, cities = len(self.model.years) + 1, len(self.model.cities) + 1
+        if years > 1:
+            year_labels = Reference(sheet_years, min_col=1, min_row=2, max_row=years)
+            salary = self.bar_chart('Уровень зарплат по годам',
+                                    Reference(sheet_years, min_col=2, min_row=1, max_col=3, max_row=years),
+                                    year_labels)
+            if 'median' in self.model.quantile_names:
+                median = LineChart()
+                median.add_data(Reference(sheet_years, min_col=6 + self.model.quantile_names.index('median'),
+                                          min_row=1, max_row=years), titles_from_data=True)
+                median.set_categories(year_labels)
+                median.series[0].marker.symbol = 'circle'
+                median.series[0].graphicalProperties.line.noFill = True
+                salary += median
+            sheet.add_chart(salary, 'D1')
+            sheet.add_chart(self.bar_chart('Количество вакансий по годам',
+                                           Reference(sheet_years, min_col=4, min_row=1, max_col=5, max_row=years),
+                                           year_labels), 'N1')
+        if cities > 1:
+            chart = self.bar_chart('Уровень зарплат по городам',
+                                   Reference(sheet_cities, min_col=2, min_row=1, max_row=cities),
+                                   Reference(sheet_cities, min_col=1, min_row=2, max_row=cities))
+            chart.type = 'bar'
+            chart.x_axis.scaling.orientation = 'maxMin'
+            chart.legend = None
+            sheet.add_chart(chart, 'D17')
+        shares = len(self.model.share_cities) + 2
+        pie = PieChart()
+        pie.title = 'Доля вакансий по городам'
+        pie.add_data(Reference(sheet, min_col=2, min_row=1, max_row=shares), titles_from_data=True)
+        pie.set_categories(Reference(sheet, min_col=1, min_row=2, max_row=shares))
+        pie.dataLabels = DataLabelList(showPercent=True)
+        sheet.add_chart(pie, 'N17')
+
+    @staticmethod
+    def bar_chart(title: str, data: 'Reference', categories: 'Reference') -> 'BarChart':
+        """Создает столбчатую диаграмму excel
+
+        Args:
+            title (str): Заголовок
+            data (Reference): Столбцы значений вместе с заголовками, заголовки становятся подписями рядов
+            categories (Reference): Подписи столбцов
+
+        Returns:
+            BarChart: Диаграмма
+        """
+        from openpyxl.chart import BarChart
+
+        chart = BarChart()
+        chart.title = title
+        chart.add_data(data, titles_from_data=True)
+        chart.set_categories(categories)
+        chart.x_axis.delete = False
+        chart.y_axis.delete = False
+        return chart
+
     def filling_first_sheet(self):
         """Заполняет первую страницу excel файла
         """
-        for index, key in enumerate(self.vacancies_count):
-            self.sheet_years[index + 2][0].value = key
-            self.sheet_years[index + 2][1].value = self.vacancies_salary[key]
-            self.sheet_years[index + 2][2].value = self.prof_salary[key]
-            self.sheet_years[index + 2][3].value = self.vacancies_count[key]
-            self.sheet_years[index + 2][4].value = self.prof_count[key]
+        for index, row in enumerate(self.model.year_rows()):
+            for column, value in enumerate(row):
+                self.sheet_years[index + 2][column].value = value
 
     def filling_second_sheet(self):
         """Заполняет вторую страницу excel файла
         """
-        for index, key in enumerate(self.cities_salary):
-            self.sheet_cities[index + 2][0].value = key
-            self.sheet_cities[index + 2][1].value = self.cities_salary[key]
+        shift = len(self.model.city_columns()) - 2
+        for index, row in enumerate(self.model.city_salary_rows()):
+            for column, value in enumerate(row):
+                self.sheet_cities[index + 2][column].value = value
 
-        for index, key in enumerate(self.cities_procent):
-            self.sheet_cities[index + 2][3].value = key
-            self.sheet_cities[index + 2][4].value = f'{round(self.cities_procent[key] * 100, 2)}%'
+        for index, (city, procent) in enumerate(self.model.city_share_rows()):
+            self.sheet_cities[index + 2][3 + shift].value = city
+            self.sheet_cities[index + 2][4 + shift].value = procent
 
     @staticmethod
-    def sheet_formatting(sheet):
+    def sheet_formatting(sheet, right_column: int = 5):
         """Форматирует таблицу: устанавливает ширину столбцов, границы, толщину текста
 
         Args:
             sheet (object): Страница
+            right_column (int): Номер столбца, значения которого выравниваются по правому краю
         """
-        edge = Side(border_style='thin', color='000000')
+        from openpyxl.styles import Font, Alignment
+        from openpyxl.utils import get_column_letter
+
+        header_font, font, right = Font(bold=True), Font(), Alignment(horizontal='right')
+        border = report_border()
         for index, column in enumerate(sheet.columns):
             cell_width = 0
             for element in column:
-                element.font = Font(bold=True) if element.row == 1 else Font()
+                element.font = header_font if element.row == 1 else font
                 if element.value:
                     cell_width = len(str(element.value)) + 2 if len(str(element.value)) + 2 > cell_width else cell_width
-                    element.border = Border(left=edge, top=edge, right=edge, bottom=edge)
+                    element.border = border
                 else:
                     cell_width = 2
-                if element.row > 1 and element.column == 5:
-                    element.alignment = Alignment(horizontal='right')
+                if element.row > 1 and element.column == right_column:
+                    element.alignment = right
             sheet.column_dimensions[get_column_letter(index + 1)].width = cell_width
 
+    def year_rows(self):
+        """Создает строки страницы статистики по годам вместе с заголовком
+
+        Yields:
+            tuple: Значения строки
+        """
+        yield tuple(self.year_columns())
+        yield from self.model.year_rows()
+
+    def city_rows(self):
+        """Создает строки страницы статистики по городам вместе с заголовком: слева зарплаты, справа доли
+        вакансий, пропуски в более короткой таблице заполняются None
+
+        Yields:
+            tuple: Значения строки
+        """
+        city_columns = self.model.city_columns()
+        yield *city_columns, '', 'Город', 'Доля вакансий'
+        for salary_row, procent_row in zip_longest(self.model.city_salary_rows(), self.model.city_share_rows()):
+            yield (*(salary_row or (None,) * len(city_columns)), None, *(procent_row or (None, None)))
+
+    @staticmethod
+    def column_widths(rows) -> list:
+        """Считает ширину столбцов по значениям так же, как sheet_formatting
+
+        Args:
+            rows (iterable): Строки страницы одинаковой длины
+
+        Returns:
+            list: Ширина каждого столбца
+        """
+        widths = []
+        for row in rows:
+            if not widths:
+                widths = [0] * len(row)
+            for index, value in enumerate(row):
+                widths[index] = max(widths[index], len(str(value)) + 2) if value else 2
+        return widths
+
+    @staticmethod
+    def report_styles(workbook) -> dict:
+        """Регистрирует в книге именованные стили ячеек отчета
+
+        Args:
+            workbook (Workbook): Книга
+
+        Returns:
+            dict: Имена стилей по признакам (заголовок, есть значение, выравнивание вправо)
+        """
+        from openpyxl.styles import Font, Alignment, NamedStyle
+        from openpyxl.styles.borders import DEFAULT_BORDER
+
+        styles, border = {}, report_border()
+        for header in True, False:
+            for bordered in True, False:
+                for right in (False, True) if not header else (False,):
+                    name = f'report {"header" if header else "cell"}{" bordered" if bordered else ""}' \
+                           f'{" right" if right else ""}'
+                    workbook.add_named_style(NamedStyle(
+                        name, font=Font(bold=True) if header else Font(),
+                        border=border if bordered else DEFAULT_BORDER,
+                        alignment=Alignment(horizontal='right') if right else Alignment()))
+                    styles[header, bordered, right] = name
+        return styles
+
+    def all_vacancies_rows(self):
+        """Создает строки общей для всех профессий страницы статистики по годам вместе с заголовком
+
+        Yields:
+            tuple: Значения строки
+        """
+        yield 'Год', 'Средняя зарплата', 'Количество вакансий', *self.model.quantile_titles()
+        yield from zip(self.model.years, self.model.salaries, self.model.counts, *self.model.year_quantiles)
+
+    def write_sheet(self, workbook, title: str, rows, styles: dict, right_column: int = 5, widths: list = None):
+        """Потоково записывает страницу в книгу в режиме write-only
+
+        Ширина столбцов в xlsx хранится перед строками, поэтому сначала строки проходятся без создания ячеек
+        для подсчета ширины, а затем записываются
+
+        Args:
+            workbook (Workbook): Книга в режиме write-only
+            title (str): Название страницы
+            rows (callable): Функция без аргументов, возвращающая строки страницы, см. year_rows
+            styles (dict): Именованные стили, см. report_styles
+            right_column (int): Номер столбца, значения которого выравниваются по правому краю
+            widths (list): Заранее посчитанная ширина столбцов, см. column_widths
+
+        Returns:
+            WriteOnlyWorksheet: Записанная страница
+        """
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        sheet = workbook.create_sheet(title)
+        for index, width in enumerate(self.column_widths(rows()) if widths is None else widths, 1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        for row_index, row in enumerate(rows(), 1):
+            cells = []
+            for column, value in enumerate(row, 1):
+                cell = WriteOnlyCell(sheet, value)
+                cell.style = styles[row_index == 1, bool(value), row_index > 1 and column == right_column]
+                cells.append(cell)
+            sheet.append(cells)
+        return sheet
+
 
 class SetGraph:
     """Класс для создания графиков статистики по вакансиям
@@ -182,11 +429,15 @@ class SetGraph:
         prof_count (dict): Количестве вакансий профессии за определенный год
         cities_salary (dict): Средние зарплаты в городе
         cities_procent (dict): Коэффицент отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
+        salary_quantiles (dict): Квантили зарплат по годам для каждого квантиля из QUANTILES
+        city_quantiles (dict): Квантили зарплат по городам для каждого квантиля из QUANTILES
+        model (ReportModel): Выровненные данные отчета, по которым строятся графики
         o_x (int or float): Ось X
         o_y (int or float): Ось Y
         figure (object): Подложка для графиков
         axes (object): Оси графиков
         width (float): Ширина
+        drawn (bool): Нарисованы ли графики на подложке
 
         >>> type(SetGraph({2017: 20000}, {2017: 50}, {2017: 50000}, {2017: 5}, {'Москва': 0.56}, {'Москва': 10000}, 'Программист')).__name__
         'SetGraph'
@@ -206,7 +457,9 @@ class SetGraph:
         {'Москва': 10000}
     """
     def __init__(self, vacancies_salary: dict, vacancies_count: dict, profes_salary: dict, profes_count: dict,
-                 cities_procent: dict, cities_data: dict, profes_name: str):
+                 cities_procent: dict, cities_data: dict, profes_name: str, salary_quantiles: dict = None,
+                 city_quantiles: dict = None, model: ReportModel = None, figure: 'Figure' = None,
+                 layout: dict = None):
         """Инициализирует класс Setgraph, создает оси и подложки для построения графиков
 
         Args:
@@ -217,7 +470,16 @@ class SetGraph:
             profes_count (dict): Количестве вакансий профессии за определенный год
             cities_data (dict): Средние зарплаты в городе
             cities_procent (dict): Коэффицент отношения кол-ва вакансий в городе относительно общего кол-ва вакансий
+            salary_quantiles (dict): Квантили зарплат по годам, см. DataSet.vacancies_quantiles
+            city_quantiles (dict): Квантили зарплат по городам, см. DataSet.city_quantiles
+            model (ReportModel): Готовые данные отчета, по умолчанию строятся из переданных словарей
+            figure (Figure): Подложка для повторного использования, ее прежнее содержимое очищается.
+                По умолчанию создается новая подложка с холстом Agg, без глобального состояния pyplot
+            layout (dict): Постоянные отступы сетки 2x2 для Figure.subplots_adjust, см. GRAPH_LAYOUT.
+                По умолчанию отступы подбираются tight_layout для каждого набора графиков
         """
+        import numpy as np
+
         self.profession = profes_name
         self.vacancies_salary = vacancies_salary
         self.vacancies_count = vacancies_count
@@ -225,29 +487,103 @@ class SetGraph:
         self.prof_count = profes_count
         self.cities_salary = cities_data
         self.cities_procent = cities_procent
-
-        self.o_x = np.arange(len(self.vacancies_count.keys()))
-        self.o_y = np.arange(len(self.cities_salary.keys()))
-        self.figure, self.axes = plt.subplots(2, 2, figsize=(8.5, 6))
+        self.salary_quantiles = salary_quantiles or {}
+        self.city_quantiles = city_quantiles or {}
+        self.model = model or ReportModel.build(profes_name, vacancies_salary, vacancies_count, profes_salary,
+                                                profes_count, cities_procent, cities_data, salary_quantiles,
+                                                city_quantiles)
+
+        self.o_x = np.arange(len(self.model.years))
+        self.o_y = np.arange(len(self.model.cities))
+        if figure is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            figure = Figure(figsize=GRAPH_SIZE)
+            FigureCanvasAgg(figure)
+        else:
+            figure.clear()
+        self.figure = figure
+        self.axes = figure.subplots(2, 2)
+        self.layout = layout
         self.width = 0.44
+        self.drawn = False
 
-    def create_graph(self):
+    def create_graph(self, file_name: str = 'graph.png'):
         """Создает изображение с графиками
+
+        Args:
+            file_name (str): Название файла изображения
+        """
+        self.draw()
+        self.figure.savefig(file_name)
+
+    def draw(self):
+        """Рисует графики на подложке, повторные вызовы ничего не делают
         """
+        if self.drawn:
+            return
         SetGraph.create_salary_graph(self)
         SetGraph.create_cities_part_graph(self)
         SetGraph.create_vacancy_count_graph(self)
         SetGraph.create_cities_salary_graph(self)
-        self.figure.tight_layout()
-        plt.savefig('graph.png')
+        if self.layout is None:
+            self.figure.tight_layout()
+        else:
+            self.figure.subplots_adjust(**self.layout)
+        self.drawn = True
+
+    def image(self, image_format: str = 'png') -> bytes:
+        """Рисует графики в память
+
+        Args:
+            image_format (str): Формат изображения, например 'png' или 'svg'
+
+        Returns:
+            bytes: Содержимое файла изображения
+        """
+        self.draw()
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format=image_format)
+        return buffer.getvalue()
+
+    def data_uri(self, image_format: str = 'png') -> str:
+        """Рисует графики в память и возвращает их как data URI для html шаблона отчета, без записи на диск
+
+        Args:
+            image_format (str): 'png' или 'svg'. svg меньше и масштабируется без потерь в wkhtmltopdf,
+                но создание pdf средствами Python встраивает только png
+
+        Returns:
+            str: data URI изображения
+        """
+        mime = 'image/svg+xml' if image_format == 'svg' else f'image/{image_format}'
+        return f'data:{mime};base64,{base64.b64encode(self.image(image_format)).decode("ascii")}'
 
     def create_salary_graph(self):
-        """Создает график зарплат по годам
+        """Создает график зарплат по годам. Из квантилей рисуются те, что есть в данных: медиана
+        (с интервалом 25-75%, если есть оба перцентиля) и 90-й перцентиль
         """
-        self.axes[0, 0].bar(self.o_x - self.width / 2, self.vacancies_salary.values(), self.width, label='Средняя з/п')
-        self.axes[0, 0].bar(self.o_x + self.width / 2, self.prof_salary.values(), self.width,
+        self.axes[0, 0].bar(self.o_x - self.width / 2, self.model.salaries, self.width, label='Средняя з/п')
+        self.axes[0, 0].bar(self.o_x + self.width / 2, self.model.profession_salaries, self.width,
                             label=f'З/п: {self.profession.lower()}')
-        self.axes[0, 0].set_xticks(self.o_x, self.vacancies_salary.keys(), rotation=90, fontsize=8)
+        names = self.model.quantile_names
+        if 'median' in names:
+            import numpy as np
+
+            median = np.array(self.model.year_quantile('median'))
+            if 'p25' in names and 'p75' in names:
+                lower = median - self.model.year_quantile('p25')
+                upper = np.array(self.model.year_quantile('p75')) - median
+                self.axes[0, 0].errorbar(self.o_x - self.width / 2, median, yerr=[lower, upper], fmt='o',
+                                         color='black', markersize=2, elinewidth=0.8, label='Медиана, 25-75%')
+            else:
+                self.axes[0, 0].plot(self.o_x - self.width / 2, median, 'o', color='black', markersize=2,
+                                     label='Медиана')
+        if 'p90' in names:
+            self.axes[0, 0].plot(self.o_x - self.width / 2, self.model.year_quantile('p90'), '_', color='red',
+                                 label='90%')
+        self.axes[0, 0].set_xticks(self.o_x, self.model.years, rotation=90, fontsize=8)
         self.axes[0, 0].legend(fontsize=8)
         self.axes[0, 0].grid(axis='y')
         self.axes[0, 0].set_title('Уровень зарплат по годам', fontsize=15)
@@ -255,9 +591,9 @@ class SetGraph:
     def create_cities_part_graph(self):
         """Создает график с процентным соотношением количества вакансий в городах относительно общего кол-ва
         """
-        arg = [x * 100 for x in self.cities_procent.values()]
+        arg = [x * 100 for x in self.model.shares]
         arg.append(100 - sum(arg))
-        arg1 = list(self.cities_salary.keys())
+        arg1 = list(self.model.share_cities)
         arg1.append('Другие')
         self.axes[1, 1].pie(arg, labels=arg1, textprops={'fontsize': 6})
         self.axes[1, 1].set_title('Количество вакансий по годам', fontsize=15)
@@ -265,21 +601,25 @@ class SetGraph:
     def create_cities_salary_graph(self):
         """Создает график со статистикой средних зарплат в городах
         """
-        self.axes[1, 0].barh(self.o_y - self.width / 2, self.cities_salary.values(), self.width * 2)
+        self.axes[1, 0].barh(self.o_y - self.width / 2, self.model.city_salaries, self.width * 2)
+        if self.model.city_medians is not None:
+            self.axes[1, 0].plot(self.model.city_medians, self.o_y - self.width / 2, 'o', color='black',
+                                 markersize=2, label='Медиана')
+            self.axes[1, 0].legend(fontsize=8)
         self.axes[1, 0].set_title('Уровень зарплат по городам', fontsize=15)
-        self.axes[1, 0].set_yticks(self.o_y, self.cities_salary.keys(), fontsize=8)
+        self.axes[1, 0].set_yticks(self.o_y, self.model.cities, fontsize=8)
         self.axes[1, 0].grid(axis='x')
         self.axes[1, 0].invert_yaxis()
 
     def create_vacancy_count_graph(self):
         """Создает график с информацией о кол-ве вакансий в разные годы
         """
-        self.axes[0, 1].bar(self.o_x - self.width / 2, self.vacancies_count.values(), self.width,
+        self.axes[0, 1].bar(self.o_x - self.width / 2, self.model.counts, self.width,
                             label='Количество вакансий')
-        self.axes[0, 1].bar(self.o_x + self.width / 2, self.prof_count.values(), self.width,
+        self.axes[0, 1].bar(self.o_x + self.width / 2, self.model.profession_counts, self.width,
                             label=f'Кол-во вакансий: {self.profession.lower()}')
         self.axes[0, 1].set_title('Количество вакансий по годам', fontsize=15)
-        self.axes[0, 1].set_xticks(self.o_x, self.vacancies_count.keys(), rotation=90, fontsize=8)
+        self.axes[0, 1].set_xticks(self.o_x, self.model.years, rotation=90, fontsize=8)
         self.axes[0, 1].grid(axis='y')
         self.axes[0, 1].legend(fontsize=8, loc='upper left')
 
@@ -295,12 +635,15 @@ class Vacancy:
         avarage_salary (int): Среднее значение оклада
         area_name (str): Город, в котором расположена вакансия
         published_at (str): Год публикации
+        published_month (int): Номер месяца публикации (год * 12 + месяц - 1)
     """
-    def __init__(self, row: dict):
+    def __init__(self, row: dict, rates: 'RateTable' = None):
         """Инициализирует объект Vacancy, выполняет конвертацию для целочисленных значений
 
         Args:
             row (dict): Информация о вакансии
+            rates (RateTable): Исторические курсы валют, оклад переводится по курсу месяца публикации.
+                По умолчанию используются постоянные курсы currency_to_rub
 
         >>> type(Vacancy({'name': 'Аналитик', 'salary_from': '20000.0', 'salary_to': '30000.0', 'salary_currency': 'RUR', 'area_name': 'Екатеринбург', 'published_at':'2022:20:14'})).__name__
         'Vacancy'
@@ -323,9 +666,49 @@ class Vacancy:
         self.salary_from = int(row['salary_from'].split('.')[0])
         self.salary_to = int(row['salary_to'].split('.')[0])
         self.salary_currency = row['salary_currency']
-        self.avarage_salary = int((self.salary_from + self.salary_to) / 2 * currency_to_rub[self.salary_currency])
         self.area_name = row['area_name']
         self.published_at = int(row['published_at'][0:4])
+        self.published_month = month_ordinal(row['published_at'])
+        rate = (currency_to_rub[self.salary_currency] if rates is None
+                else rates.rate(self.salary_currency, self.published_month))
+        self.avarage_salary = int((self.salary_from + self.salary_to) / 2 * rate)
+
+
+class LazyRow(Mapping):
+    """Запись csv файла, поля которой очищаются от html тегов только при первом обращении
+
+    Attributes:
+        positions (dict): Номера столбцов по их названиям
+        values (list): Сырые значения полей
+        cleaned (dict): Уже очищенные значения полей
+    """
+    def __init__(self, positions: dict, values: list):
+        """Инициализирует объект LazyRow
+
+        Args:
+            positions (dict): Номера столбцов по их названиям
+            values (list): Сырые значения полей
+
+        >>> row = LazyRow({'name': 0, 'description': 1}, ['Аналитик', '<p>Описание</p>'])
+        >>> row['name'], row.cleaned
+        ('Аналитик', {'name': 'Аналитик'})
+        >>> dict(row)
+        {'name': 'Аналитик', 'description': 'Описание'}
+        """
+        self.positions = positions
+        self.values = values
+        self.cleaned = {}
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self.cleaned:
+            self.cleaned[key] = DataSet.clean_field(self.values[self.positions[key]])
+        return self.cleaned[key]
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
 
 
 class DataSet:
@@ -333,41 +716,97 @@ class DataSet:
 
     Attributes:
         file_name (str): Название файла
-        profession (str): Название профессии
-        profession_data (dict):  Средник зарплаты по профессии за определенный год
-        profession_counter (dict): Количестве вакансий профессии за определенный год
+        profession (str or list): Название профессии или список названий
+        professions (tuple): Названия профессий
+        streaming (bool): Потоковый режим обработки вакансий
+        columnar (bool): Хранение вакансий в колоночной таблице вместо списка объектов Vacancy
+        cache_dir (str): Папка кеша колоночной таблицы
+        indexed (bool): Строки профессий ищутся по индексу названий
+        city_capacity (int): Максимальное количество хранимых городов или None для точного подсчета
+        quantiles (bool): Рассчитываются ли квантили зарплат
+        cube (SalaryCube): Предрассчитанный куб, по которому считается статистика вместо файла
+        rates (RateTable): Исторические курсы валют или None для постоянных курсов currency_to_rub
+        currency_rates (dict or RateTable): Курсы, по которым считаются оклады в рублях
+        statistics (VacancyStatistics): Накопленные суммы и количества зарплат
+        profession_data (dict):  Средник зарплаты по профессии за определенный год, пустой без профессий
+        profession_counter (dict): Количестве вакансий профессии за определенный год, пустой без профессий
+        professions_data (dict): Средние зарплаты по годам для каждой профессии
+        professions_counter (dict): Количество вакансий по годам для каждой профессии
         vacancies_data (dict): Средник зарплаты за определенный год
         vacancies_counter (dict): Количестве вакансий за определенный год
-        city_data (dict): Средняя зарплата по городам
-        city_procent (dict): КоэфФицент кол-ва вакансий в городе от общего кол-вва
-        city_counter (dict): Кол-во вакансий в городе
+        vacancies_quantiles (dict): Квантили зарплат по годам для каждого квантиля из QUANTILES
+        city_data (dict): Средняя зарплата по городам в порядке подсчета, см. city_sorting
+        city_procent (dict): КоэфФицент кол-ва вакансий в городе от общего кол-вва в порядке подсчета
+        city_counter (dict): Кол-во вакансий в городе, при приближенном подсчете гарантированное (нижняя граница)
+        city_bounds (dict): Границы истинного кол-ва вакансий в городе при приближенном подсчете
+        city_quantiles (dict): Квантили зарплат по городам для каждого квантиля из QUANTILES
         cut_city_data (dict): Топ от высшей до низшей средней зарплаты по городам в размере 10 элементов
         cut_city_procent (dict): Топ по отношению к общему кол-ву вакансий по городам в размере 10 элементов
+        table (VacancyTable): Колоночная таблица вакансий
+        index (NameIndex): Индекс названий вакансий колоночной таблицы
         vacancies_list (list): Обработанный список вакансий
         total_counter (int): Счетчик вакансий
     """
-    def __init__(self, file_name: str, profession: str):
+    def __init__(self, file_name: str, profession, streaming: bool = False, columnar: bool = False,
+                 cache_dir: str = None, indexed: bool = False, city_capacity: int = None, quantiles: bool = False,
+                 cube: bool = False, rates: 'RateTable' = None):
         """Инициализирует объект Vacancy
 
         Args:
             file_name (str): Название файла
-            profession (str): Название профессии
+            profession (str or list): Название профессии или список названий, статистика по всем профессиям
+                собирается за один проход. profession_data и profession_counter заполняются для первой из них
+            streaming (bool): Потоковый режим: вакансии читаются из файла по одной и не хранятся в памяти
+            columnar (bool): Вакансии загружаются в колоночную таблицу VacancyTable
+            cache_dir (str): Папка кеша: колоночная таблица сохраняется в ней и загружается повторно,
+                пока исходный файл не изменится
+            indexed (bool): По колоночной таблице строится инвертированный индекс названий, и строки
+                профессий берутся из него. Включает columnar
+            city_capacity (int): Города считаются приближенно (Space-Saving) в памяти на столько городов.
+                Все города с долей больше 1 / city_capacity гарантированно попадают в статистику.
+                Отбор городов с долей >1%, доли и топы считаются по нижним границам количеств, поэтому
+                редкие города с завышенной оценкой не вытесняют из отчета крупные
+            quantiles (bool): Рассчитывать медиану, 25-й, 75-й и 90-й перцентили зарплат по годам и городам
+                по скетчам квантилей с относительной погрешностью 1%
+            cube (bool): Считать статистику по кубу из папки кеша (см. build_cube), не читая файл. Если куба нет,
+                он устарел или в нем нет нужного измерения (профессии, квантилей), файл обрабатывается как обычно.
+                Куб считается по постоянным курсам и не используется вместе с rates
+            rates (RateTable): Исторические курсы валют (см. currency_rates.load_rates): оклад каждой вакансии
+                переводится в рубли по курсу месяца ее публикации
         """
         self.file_name = file_name
         self.profession = profession
+        self.streaming = streaming
+        self.columnar = columnar or indexed
+        self.indexed = indexed
+        self.cache_dir = cache_dir
+        self.city_capacity = city_capacity
+        self.quantiles = quantiles
+        self.rates = rates
+        self.currency_rates = currency_to_rub if rates is None else rates
+        self.statistics = VacancyStatistics(profession, city_capacity=city_capacity, quantiles=quantiles)
+        self.professions = self.statistics.professions
         self.profession_data = {}
         self.profession_counter = {}
+        self.professions_data = {}
+        self.professions_counter = {}
 
         self.vacancies_data = {}
         self.vacancies_counter = {}
+        self.vacancies_quantiles = {}
 
         self.city_data = {}
         self.city_procent = {}
         self.city_counter = {}
+        self.city_bounds = {}
+        self.city_quantiles = {}
         self.cut_city_data = {}
         self.cut_city_procent = {}
 
-        self.vacancies_list = self.csv_uni()
+        self.cube = self.open_cube() if cube else None
+        self.table = self.load_table() if self.columnar and self.cube is None else None
+        self.index = self.load_index() if self.indexed and self.table is not None else None
+        self.vacancies_list = [] if self.streaming or self.columnar or self.cube is not None else self.csv_uni()
 
         self.total_counter = 0
 
@@ -383,106 +822,352 @@ class DataSet:
         'Программист'
 
         """
-        csv_file_data = open(self.file_name, 'r', encoding='utf-8-sig')
-        file_data_reader = csv.reader(csv_file_data)
-        title = next(file_data_reader)
+        return [Vacancy(row, self.rates) for row in self.read_rows(vacancy_columns)]
+
+    def load_table(self) -> 'VacancyTable':
+        """Строит колоночную таблицу вакансий или, если задана папка кеша, загружает ее из кеша
+
+        Returns:
+            VacancyTable: Колоночная таблица вакансий
+        """
+        from vacancy_table import VacancyTable
+        from dataset_cache import cached_table
+
+        if self.cache_dir is None:
+            return VacancyTable.from_rows(self.read_rows(vacancy_columns))
+        return cached_table(self.file_name, lambda: VacancyTable.from_rows(self.read_rows(vacancy_columns)),
+                            self.cache_dir)
+
+    def open_cube(self):
+        """Загружает куб из папки кеша, если по нему можно ответить на запрос
+
+        Returns:
+            SalaryCube or None: Куб или None, если нужно читать исходный файл
+        """
+        if self.cache_dir is None or self.quantiles or self.rates is not None:
+            return None
+        from dataset_cache import load_cube
+
+        cube = load_cube(self.file_name, self.cache_dir)
+        return cube if cube is not None and cube.covers(self.professions) else None
+
+    def load_index(self) -> 'NameIndex':
+        """Строит индекс названий по колоночной таблице или, если задана папка кеша, загружает его из кеша
+
+        Returns:
+            NameIndex: Индекс названий вакансий
+        """
+        from name_index import NameIndex
+        from dataset_cache import cached_index
+
+        if self.cache_dir is None:
+            return NameIndex.build(self.table)
+        return cached_index(self.file_name, lambda: NameIndex.build(self.table), self.cache_dir)
+
+    def query_profession(self, profession: str) -> tuple:
+        """Рассчитывает зарплаты и количество вакансий по годам для профессии по индексу названий,
+        не просматривая файл и всю таблицу. Если колоночная таблица не загружена (columnar не задан
+        или статистика взята из куба), она строится или загружается из кеша при первом запросе
+
+        Args:
+            profession (str): Название профессии
+
+        Returns:
+            tuple: Средние зарплаты по годам и количество вакансий по годам
+        """
+        from aggregation import aggregate_rows
+
+        if self.table is None:
+            self.table = self.load_table()
+        if self.index is None:
+            self.index = self.load_index()
+        accumulator = aggregate_rows(self.table, self.index.rows(profession), self.currency_rates)
+        return accumulator.averages(), dict(accumulator.counts)
+
+    def read_rows(self, columns: tuple = None):
+        """Построчно читает сырой csv файл вакансий, не загружая его в память целиком
+
+        Args:
+            columns (tuple): Нужные столбцы, только они очищаются и попадают в результат.
+                Если не заданы, возвращаются все столбцы, которые очищаются при первом обращении
+
+        Yields:
+            dict or LazyRow: Очищенная информация о вакансии
+        """
+        with open(self.file_name, 'r', encoding='utf-8-sig') as csv_file_data:
+            file_data_reader = csv.reader(csv_file_data)
+            title = next(file_data_reader)
+            title[len(title) - 1] = 'published_at'
+            yield from self.clean_rows(title, file_data_reader, columns)
+
+    def read_byte_range(self, start: int, end: int, columns: tuple = None):
+        """Читает часть csv файла вакансий в диапазоне байт, начинающемся и заканчивающемся на границе записи
+
+        Args:
+            start (int): Смещение начала диапазона
+            end (int): Смещение конца диапазона
+            columns (tuple): Нужные столбцы, см. read_rows
+
+        Yields:
+            dict or LazyRow: Очищенная информация о вакансии
+        """
+        title = read_title(self.file_name)[0]
         title[len(title) - 1] = 'published_at'
-        file_data_list = [x for x in list(file_data_reader) if len(x) == len(title) and not x.__contains__("")]
-        csv_file_data.close()
-        vacancy_edited = {}
-        vacancies_objects = []
-        for vacancy in file_data_list:
-            for i in range(0, len(title)):
-                if vacancy[i].__contains__('\n'):
-                    vacancy[i] = '!'.join(vacancy[i].split('\n'))
+        yield from self.clean_rows(title, read_records(self.file_name, start, end), columns)
+
+    def clean_rows(self, title: list, records, columns: tuple = None):
+        """Отбрасывает некорректные записи и очищает поля остальных
+
+        Args:
+            title (list): Названия столбцов
+            records (iterable): Сырые записи csv файла
+            columns (tuple): Нужные столбцы, см. read_rows
+
+        Yields:
+            dict or LazyRow: Очищенная информация о вакансии
+        """
+        positions = {column: index for index, column in enumerate(title)}
+        projection = [(column, positions[column]) for column in columns] if columns is not None else None
+        for vacancy in records:
+            if len(vacancy) == len(title) and "" not in vacancy:
+                if projection is None:
+                    yield LazyRow(positions, vacancy)
                 else:
-                    vacancy[i] = " ".join(re.sub(r'\<[^>]*\>', '', vacancy[i]).split())
-                vacancy_edited[title[i]] = vacancy[i]
-            vacancies_objects.append(Vacancy(vacancy_edited.copy()))
-            vacancy_edited.clear()
-        return vacancies_objects
+                    yield {column: self.clean_field(vacancy[index]) for column, index in projection}
+
+    @staticmethod
+    def clean_field(value: str) -> str:
+        """Очищает поле вакансии от html тегов и лишних пробелов, переносы строк заменяет на '!'
+
+        Args:
+            value (str): Сырое значение поля
+
+        Returns:
+            str: Очищенное значение поля
 
-    def set_data_for_graphics(self):
+        >>> DataSet.clean_field('<p>Программист  <b>Python</b></p>')
+        'Программист Python'
+        """
+        if '\n' in value:
+            return '!'.join(value.split('\n'))
+        if '<' in value:
+            value = re.sub(r'\<[^>]*\>', '', value)
+        return " ".join(value.split())
+
+    def vacancies(self):
+        """Возвращает вакансии для обработки: из колоночной таблицы, из памяти или, в потоковом режиме, напрямую из файла
+
+        Returns:
+            iterator: Итератор по вакансиям
+        """
+        if self.table is not None:
+            return self.table.records(self.currency_rates)
+        if self.streaming:
+            return (Vacancy(row, self.rates) for row in self.read_rows(vacancy_columns))
+        return iter(self.vacancies_list)
+
+    def set_data_for_graphics(self, vectorized: bool = True):
         """Обрабатытвает и создает данные для графиков
 
+        Args:
+            vectorized (bool): Для колоночной таблицы считать статистику групповыми редукциями numpy, а не циклом
         """
-        for vacancy in self.vacancies_list:
-            if vacancy.published_at not in self.vacancies_data:
-                self.vacancies_data[vacancy.published_at] = vacancy.avarage_salary
-                self.vacancies_counter[vacancy.published_at] = 1
-                self.profession_counter[vacancy.published_at] = 0
-                self.profession_data[vacancy.published_at] = 0
-            else:
-                self.vacancies_counter[vacancy.published_at] += 1
-                self.vacancies_data[vacancy.published_at] = self.vacancies_data[
-                                                                vacancy.published_at] + vacancy.avarage_salary
-
-            if self.profession in vacancy.name:
-                self.profession_counter[vacancy.published_at] += 1
-                self.profession_data[vacancy.published_at] = self.profession_data[
-                                                                 vacancy.published_at] + vacancy.avarage_salary
-
-            if vacancy.area_name not in self.city_data:
-                self.city_data[vacancy.area_name] = vacancy.avarage_salary
-                self.city_counter[vacancy.area_name] = 1
-            else:
-                self.city_counter[vacancy.area_name] += 1
-                self.city_data[vacancy.area_name] = self.city_data[vacancy.area_name] + vacancy.avarage_salary
+        if self.cube is not None:
+            self.statistics.merge(self.cube.statistics(self.professions))
+        elif self.table is not None and vectorized:
+            self.set_data_from_table()
+        else:
+            for vacancy in self.vacancies():
+                self.add_vacancy(vacancy)
+        self.calculate_averages()
+        self.city_cut()
+
+    def period_series(self, period: str = 'month') -> tuple:
+        """Рассчитывает средние зарплаты и количество вакансий по месяцам или кварталам публикации
+
+        Для колоночной таблицы используется колонка номеров месяцев и групповые редукции, иначе вакансии
+        обходятся построчно. Периоды идут в хронологическом порядке
+
+        Args:
+            period (str): 'month', 'quarter' или 'year'
+
+        Returns:
+            tuple: Средние зарплаты и количество вакансий по периодам, те же данные для первой профессии
+        """
+        if self.table is not None:
+            from aggregation import aggregate_periods
+
+            statistics = aggregate_periods(self.table, self.professions, self.currency_rates, period)
+        else:
+            statistics = VacancyStatistics(self.professions)
+            vacancies = self.vacancies() if self.cube is None else (Vacancy(row, self.rates)
+                                                                   for row in self.read_rows(vacancy_columns))
+            for vacancy in vacancies:
+                label = period_label(vacancy.published_month, period)
+                statistics.years.add(label, vacancy.avarage_salary)
+                for index in statistics.match(vacancy.name):
+                    statistics.profession_years[self.professions[index]].add(label, vacancy.avarage_salary)
+        periods = sorted(statistics.years.counts)
+        salaries = {key: statistics.years.average(key) for key in periods}
+        counts = {key: statistics.years.counts[key] for key in periods}
+        if not self.professions:
+            return salaries, counts, {}, {}
+        profession = statistics.profession_years[self.professions[0]]
+        return (salaries, counts, {key: profession.average(key) for key in periods},
+                {key: profession.counts.get(key, 0) for key in periods})
+
+    def set_data_from_year_files(self, directory: str = 'CSV', workers: int = None):
+        """Обрабатывает разбитые по годам файлы (см. parse_csv.create_csv_files) параллельно в нескольких процессах
+
+        Каждый процесс считает суммы и количества по своему файлу, затем они складываются в этом объекте
+
+        Args:
+            directory (str): Папка с файлами вида <год>.csv
+            workers (int): Количество процессов, по умолчанию по числу ядер
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        files = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.csv'))
+        with ProcessPoolExecutor(workers) as executor:
+            for partial in executor.map(aggregate_file, files, repeat(self.profession), repeat(self.city_capacity),
+                                        repeat(self.quantiles), repeat(self.rates)):
+                self.merge_partial(partial)
+        self.calculate_averages()
+        self.city_cut()
+
+    def set_data_parallel(self, workers: int = None, parts: int = None):
+        """Обрабатывает один большой csv файл параллельно: файл делится на диапазоны байт по границам записей,
+        каждый диапазон разбирается в своем процессе
+
+        Args:
+            workers (int): Количество процессов, по умолчанию по числу ядер
+            parts (int): Количество диапазонов, по умолчанию по количеству процессов
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        start = read_title(self.file_name)[1]
+        boundaries = find_record_boundaries(self.file_name, parts or workers or os.cpu_count(), start)
+        with ProcessPoolExecutor(workers) as executor:
+            for partial in executor.map(aggregate_byte_range, repeat(self.file_name), repeat(self.profession),
+                                        boundaries[:-1], boundaries[1:], repeat(self.city_capacity),
+                                        repeat(self.quantiles), repeat(self.rates)):
+                self.merge_partial(partial)
+        self.calculate_averages()
+        self.city_cut()
+
+    def set_data_incremental(self, state_file: str):
+        """Обрабатывает только строки, дописанные в файл после предыдущего запуска
 
-            self.total_counter += 1
+        Смещение обработанной части и накопленные суммы и количества хранятся в файле состояния.
+        Если состояния нет, файл был переписан или состояние сохранено с другими quantiles, city_capacity
+        или курсами валют, файл обрабатывается с начала
 
-        self.vacancies_data_round()
-        self.profession_data_round()
-        self.city_data_round()
-        self.get_city_procent()
-        self.city_sorting()
+        Args:
+            state_file (str): Файл состояния
+        """
+        rates = None if self.rates is None else self.rates.fingerprint()
+        state = incremental.load_state(state_file, self.file_name, list(self.professions), self.quantiles,
+                                       self.city_capacity, rates)
+        if state is None:
+            start = read_title(self.file_name)[1]
+        else:
+            start = state['offset']
+            self.merge_partial(state['statistics'])
+        end = find_last_record_end(self.file_name, start)
+        for row in self.read_byte_range(start, end, vacancy_columns):
+            self.add_vacancy(Vacancy(row, self.rates))
+        incremental.save_state(state_file, self.file_name, list(self.professions), end, self.get_partial(),
+                               self.quantiles, self.city_capacity, rates)
+        self.calculate_averages()
         self.city_cut()
 
-    def vacancies_data_round(self):
-        """Рассчитывает среднюю зарплату за год
+    def get_partial(self) -> VacancyStatistics:
+        """Возвращает накопленные суммы и количества до расчета средних
 
+        Returns:
+            VacancyStatistics: Частичный результат обработки, который можно сложить с другими через merge_partial
         """
-        for key in self.vacancies_data:
-            self.vacancies_data[key] = int(self.vacancies_data[key] / self.vacancies_counter[key])
+        return self.statistics
+
+    def merge_partial(self, partial: VacancyStatistics):
+        """Добавляет к накопленным суммам и количествам частичный результат другого процесса
 
-    def profession_data_round(self):
-        """Рассчитывает среднюю зарплату профессии за год
+        Args:
+            partial (VacancyStatistics): Частичный результат, полученный через get_partial
         """
-        for key in self.profession_data:
-            if self.profession_data[key] != 0:
-                self.profession_data[key] = int(self.profession_data[key] / self.profession_counter[key])
+        self.statistics.merge(partial)
 
-    def city_data_round(self):
-        """Рассчитывает среднюю зарплату по городам
+    def set_data_from_table(self):
+        """Добавляет статистику по колоночной таблице, рассчитанную векторизованным движком
         """
-        for key in self.city_data:
-            if self.city_data[key] != 0:
-                self.city_data[key] = int(self.city_data[key] / self.city_counter[key])
+        from aggregation import aggregate_table
+
+        self.statistics.merge(aggregate_table(self.table, self.professions, self.currency_rates, self.index,
+                                              self.quantiles))
 
-    def get_city_procent(self):
-        """Фильтрует города, где доля вакансий <1%
+    def add_vacancy(self, vacancy: Vacancy):
+        """Добавляет вакансию в накопители сумм и количеств по годам, профессии и городам
+
+        Args:
+            vacancy (Vacancy or VacancyRecord): Вакансия
         """
-        for key in self.city_counter:
-            if self.city_counter[key] / self.total_counter > 0.0100:
-                self.city_procent[key] = round(self.city_counter[key] / self.total_counter, 4)
-            else:
-                self.city_data.pop(key)
+        self.statistics.add(vacancy)
+
+    def calculate_averages(self):
+        """Рассчитывает по накопленным суммам и количествам средние зарплаты и доли вакансий,
+        отбрасывает города, где доля вакансий <1%. При приближенном подсчете городов доли считаются
+        по гарантированному количеству (количество минус погрешность), а не по оценке сверху
+        """
+        years, cities = self.statistics.years, self.statistics.cities
+        self.total_counter = self.statistics.total
+        self.vacancies_data = years.averages()
+        self.vacancies_counter = dict(years.counts)
+        for profession, accumulator in self.statistics.profession_years.items():
+            self.professions_data[profession] = {year: accumulator.average(year) for year in years.counts}
+            self.professions_counter[profession] = {year: accumulator.counts.get(year, 0) for year in years.counts}
+        if self.professions:
+            self.profession_data = self.professions_data[self.professions[0]]
+            self.profession_counter = self.professions_counter[self.professions[0]]
+        else:
+            self.profession_data, self.profession_counter = {}, {}
+        if isinstance(cities, SpaceSaving):
+            self.city_counter = {key: count - cities.errors[key] for key, count in cities.counts.items()}
+        else:
+            self.city_counter = dict(cities.counts)
+        self.city_data = {}
+        self.city_procent = {}
+        for key, count in self.city_counter.items():
+            if count / self.total_counter > 0.0100:
+                self.city_data[key] = cities.average(key)
+                self.city_procent[key] = round(count / self.total_counter, 4)
+        if isinstance(cities, SpaceSaving):
+            self.city_bounds = {key: cities.bounds(key) for key in self.city_data}
+        if self.quantiles:
+            year_quantiles = {year: self.statistics.year_sketches[year].quantiles() for year in years.counts}
+            city_quantiles = {city: self.statistics.city_sketches[city].quantiles() for city in self.city_data}
+            self.vacancies_quantiles = {name: {year: values[name] for year, values in year_quantiles.items()}
+                                        for name in QUANTILES}
+            self.city_quantiles = {name: {city: values[name] for city, values in city_quantiles.items()}
+                                   for name in QUANTILES}
 
     def city_sorting(self):
-        """Сортирует данные о городах в порядке убывания
+        """Сортирует данные о городах в порядке убывания. Пути обработки его не вызывают: для отчетов
+        нужны только топы городов, которые выбирает city_cut. Вызывается, когда нужны все города по порядку
         """
         sorted_city_data = sorted(self.city_data.items(), key=lambda item: item[1], reverse=True)
         self.city_data = {k: v for k, v in sorted_city_data}
         sorted_city_procents = sorted(self.city_procent.items(), key=lambda item: item[1], reverse=True)
         self.city_procent = {k: v for k, v in sorted_city_procents}
 
-    def city_cut(self):
-        """Обрезает данные о городах до 10 элементов
+    def city_cut(self, k: int = 10):
+        """Оставляет k городов с наибольшими значениями. Выбор идет кучей за O(n log k),
+        поэтому данные о городах не обязательно сортировать заранее
+
+        Args:
+            k (int): Количество городов
         """
-        cut_city_data = list(self.city_data.items())[:10]
-        self.cut_city_data = {k: v for k, v in cut_city_data}
-        cut_city_procent = list(self.city_procent.items())[:10]
-        self.cut_city_procent = {k: v for k, v in cut_city_procent}
+        self.cut_city_data = top_items(self.city_data, k)
+        self.cut_city_procent = top_items(self.city_procent, k)
 
     def get_data(self) -> tuple:
         """Возвращает кортеж данных о вакансиях
@@ -493,43 +1178,319 @@ class DataSet:
         return self.vacancies_data, self.vacancies_counter, self.profession_data, self.profession_counter, self.cut_city_procent, self.cut_city_data
 
 
+def build_cube(file_name: str, professions, cache_dir: str = '.vacancy_cache') -> 'SalaryCube':
+    """Строит куб сумм и количеств зарплат по годам, городам, валютам и профессиям и сохраняет его в кеш
+
+    После этого DataSet(..., cache_dir=cache_dir, cube=True) для любых из этих профессий не читает файл
+
+    Args:
+        file_name (str): Название файла
+        professions (str or list): Профессии, которые войдут в измерение профессий куба
+        cache_dir (str): Папка кеша
+
+    Returns:
+        SalaryCube: Куб
+    """
+    from cube import SalaryCube
+    from dataset_cache import save_cube
+
+    data = DataSet(file_name, professions, columnar=True, cache_dir=cache_dir)
+    cube = SalaryCube.build(data.table, data.professions, currency_to_rub)
+    save_cube(cube, file_name, cache_dir)
+    return cube
+
+
+def aggregate_file(file_name: str, profession, city_capacity: int = None, quantiles: bool = False,
+                   rates: 'RateTable' = None) -> VacancyStatistics:
+    """Потоково обрабатывает один файл вакансий в процессе-обработчике
+
+    Args:
+        file_name (str): Название файла
+        profession (str or list): Название профессии или список названий
+        city_capacity (int): Максимальное количество хранимых городов, см. DataSet
+        quantiles (bool): Собирать скетчи квантилей зарплат
+        rates (RateTable): Исторические курсы валют
+
+    Returns:
+        VacancyStatistics: Частичный результат с суммами и количествами, см. DataSet.get_partial
+    """
+    data = DataSet(file_name, profession, streaming=True, city_capacity=city_capacity, quantiles=quantiles,
+                   rates=rates)
+    for vacancy in data.vacancies():
+        data.add_vacancy(vacancy)
+    return data.get_partial()
+
+
+def aggregate_byte_range(file_name: str, profession, start: int, end: int,
+                         city_capacity: int = None, quantiles: bool = False,
+                         rates: 'RateTable' = None) -> VacancyStatistics:
+    """Обрабатывает диапазон байт файла вакансий в процессе-обработчике
+
+    Args:
+        file_name (str): Название файла
+        profession (str or list): Название профессии или список названий
+        start (int): Смещение начала диапазона
+        end (int): Смещение конца диапазона
+        city_capacity (int): Максимальное количество хранимых городов, см. DataSet
+        quantiles (bool): Собирать скетчи квантилей зарплат
+        rates (RateTable): Исторические курсы валют
+
+    Returns:
+        VacancyStatistics: Частичный результат с суммами и количествами, см. DataSet.get_partial
+    """
+    data = DataSet(file_name, profession, streaming=True, city_capacity=city_capacity, quantiles=quantiles,
+                   rates=rates)
+    for row in data.read_byte_range(start, end, vacancy_columns):
+        data.add_vacancy(Vacancy(row, rates))
+    return data.get_partial()
+
+
+def report_border():
+    """Создает тонкую черную рамку ячеек excel отчета
+
+    Returns:
+        Border: Рамка со всех четырех сторон
+    """
+    from openpyxl.styles import Border, Side
+
+    edge = Side(border_style='thin', color='000000')
+    return Border(left=edge, top=edge, right=edge, bottom=edge)
+
+
+def report_template():
+    """Возвращает скомпилированный шаблон template.html из папки модуля. Шаблон компилируется один раз
+    и переиспользуется всеми отчетами процесса
+
+    Returns:
+        Template: Шаблон отчета
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if directory not in report_templates:
+        from jinja2 import Environment, FileSystemLoader
+
+        report_templates[directory] = Environment(loader=FileSystemLoader(directory)).get_template('template.html')
+    return report_templates[directory]
+
+
+def graph_figure() -> 'Figure':
+    """Возвращает общую для процесса подложку графиков. Пакетная отрисовка рисует все наборы графиков на ней,
+    поэтому память процесса не растет с количеством наборов
+
+    Returns:
+        Figure: Подложка размера GRAPH_SIZE с холстом Agg
+    """
+    if GRAPH_SIZE not in graph_figures:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        graph_figures[GRAPH_SIZE] = Figure(figsize=GRAPH_SIZE)
+        FigureCanvasAgg(graph_figures[GRAPH_SIZE])
+    return graph_figures[GRAPH_SIZE]
+
+
+def render_graph(model: ReportModel, file_name: str = None, image_format: str = 'png'):
+    """Рисует графики одной профессии на общей подложке процесса с постоянными отступами GRAPH_LAYOUT
+
+    Args:
+        model (ReportModel): Данные отчета
+        file_name (str): Название файла изображения, по умолчанию изображение возвращается из памяти
+        image_format (str): Формат изображения в памяти, для файла формат определяется по расширению
+
+    Returns:
+        bytes or str: Содержимое изображения или название файла
+    """
+    figure = graph_figure()
+    try:
+        graph = SetGraph({}, {}, {}, {}, {}, {}, model.profession, model=model, figure=figure, layout=GRAPH_LAYOUT)
+        if file_name is None:
+            return graph.image(image_format)
+        graph.create_graph(file_name)
+        return file_name
+    finally:
+        figure.clear()
+
+
+def render_graphs(models, file_names=None, image_format: str = 'png', workers: int = None) -> list:
+    """Рисует графики для пакета профессий параллельно в процессах-обработчиках, см. render_graph
+
+    Args:
+        models (iterable): Данные отчетов
+        file_names (iterable): Названия файлов изображений в порядке models, по умолчанию изображения
+            возвращаются из памяти
+        image_format (str): Формат изображений в памяти
+        workers (int): Количество процессов, по умолчанию по числу ядер. 0 - рисовать в этом процессе
+
+    Returns:
+        list: Содержимое изображений или названия файлов в порядке models
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    models = list(models)
+    file_names = repeat(None) if file_names is None else file_names
+    if workers == 0:
+        return [render_graph(model, file_name, image_format) for model, file_name in zip(models, file_names)]
+    chunksize = max(len(models) // (4 * (workers or os.cpu_count() or 1)), 1)
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(render_graph, models, file_names, repeat(image_format), chunksize=chunksize))
+
+
+def profession_sheet(profession: str, salaries: dict, counts: dict) -> tuple:
+    """Готовит содержимое страницы профессии для generate_batch_excel
+
+    Args:
+        profession (str): Название профессии
+        salaries (dict): Средние зарплаты профессии по годам
+        counts (dict): Количество вакансий профессии по годам
+
+    Returns:
+        tuple: Строки страницы вместе с заголовком и ширина столбцов
+
+    >>> profession_sheet('Аналитик', {2022: 50000}, {2022: 3})
+    ([('Год', 'Средняя зарплата - Аналитик', 'Количество вакансий - Аналитик'), (2022, 50000, 3)], [6, 29, 32])
+    """
+    rows = [('Год', f'Средняя зарплата - {profession}', f'Количество вакансий - {profession}')]
+    rows.extend((year, salaries[year], counts[year]) for year in counts)
+    return rows, Report.column_widths(rows)
+
+
+def sheet_title(name: str, used: set) -> str:
+    """Приводит название к допустимому названию страницы excel: без символов []:*?/\\, не длиннее 31 символа
+    и не совпадающее с уже занятыми
+
+    Args:
+        name (str): Название
+        used (set): Занятые названия, новое название добавляется в него
+
+    Returns:
+        str: Название страницы
+
+    >>> sheet_title('C/C++ программист', {'C C++ программист'})
+    'C C++ программист (2)'
+    """
+    base = re.sub(r'[\[\]:*?/\\]', ' ', name).strip()[:31] or 'Профессия'
+    title, number = base, 1
+    while title.lower() in {used_title.lower() for used_title in used}:
+        number += 1
+        title = f'{base[:31 - len(str(number)) - 3]} ({number})'
+    used.add(title)
+    return title
+
+
+def generate_batch_excel(vacancies_salary: dict, vacancies_count: dict, professions_salary: dict,
+                         professions_count: dict, cities_procent: dict, cities_data: dict,
+                         file_name: str = 'report.xlsx', salary_quantiles: dict = None, city_quantiles: dict = None,
+                         workers: int = 0):
+    """Создает одну excel книгу со страницами для всех профессий
+
+    Общие для всех профессий страницы (все вакансии по годам и статистика по городам) считаются один раз,
+    книга собирается в этом процессе в режиме write-only, см. Report.generate_excel. Строки и ширина столбцов
+    страниц профессий готовятся в этом же процессе: на страницу уходят десятки микросекунд, и запуск пула
+    с передачей строк обратно обходится дороже. Пул процессов используется, только если он задан через workers
+    и профессий не меньше BATCH_EXCEL_POOL_PROFESSIONS
+
+    Args:
+        vacancies_salary (dict): Средние зарплаты по годам
+        vacancies_count (dict): Количество вакансий по годам
+        professions_salary (dict): Средние зарплаты по годам для каждой профессии, см. DataSet.professions_data
+        professions_count (dict): Количество вакансий по годам для каждой профессии, см. DataSet.professions_counter
+        cities_procent (dict): Доли вакансий по городам
+        cities_data (dict): Средние зарплаты по городам
+        file_name (str): Название файла книги
+        salary_quantiles (dict): Квантили зарплат по годам, см. DataSet.vacancies_quantiles
+        city_quantiles (dict): Квантили зарплат по городам, см. DataSet.city_quantiles
+        workers (int): Количество процессов, None - по числу ядер. 0 - готовить страницы в этом процессе
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from openpyxl import Workbook
+
+    report = Report('', vacancies_salary, vacancies_count, {}, {}, cities_procent, cities_data, salary_quantiles,
+                    city_quantiles)
+    workbook = Workbook(write_only=True)
+    styles = report.report_styles(workbook)
+    used = set()
+    report.write_sheet(workbook, sheet_title('Все вакансии', used), report.all_vacancies_rows, styles, 0)
+    report.write_sheet(workbook, sheet_title('Статистика по городам', used), report.city_rows, styles,
+                       3 + len(report.model.city_columns()))
+    professions = list(professions_salary)
+    arguments = professions, professions_salary.values(), [professions_count[profession] for profession in professions]
+    if workers == 0 or len(professions) < BATCH_EXCEL_POOL_PROFESSIONS:
+        sheets = list(map(profession_sheet, *arguments))
+    else:
+        chunksize = max(len(professions) // (4 * (workers or os.cpu_count() or 1)), 1)
+        with ProcessPoolExecutor(workers) as executor:
+            sheets = list(executor.map(profession_sheet, *arguments, chunksize=chunksize))
+    for profession, (rows, widths) in zip(professions, sheets):
+        report.write_sheet(workbook, sheet_title(profession, used), lambda: rows, styles, 0, widths)
+    workbook.save(file_name)
+
+
 class InputConect:
     """Класс для обработки вводимых данных
 
     Attributes:
-        file_name (str): Имя файла
-        profession (str): название профессии
+        file_name (str): Имя файла или папки с файлами, разбитыми по годам
+        profession (str or list): название профессии или список названий
         data (object): Данные о вакансиях
     """
-    def __init__(self, file_name: str, profession: str):
+    def __init__(self, file_name: str, profession, streaming: bool = False, columnar: bool = False,
+                 parallel: bool = False, cache_dir: str = None, quantiles: bool = False, cube: bool = False,
+                 rates_file: str = None):
         self.file_name = file_name
         self.profession = profession
-        self.data = DataSet(self.file_name, self.profession)
-        self.data.set_data_for_graphics()
-
-
-vacancy_or_statistics = input('Вакансии или Статистика: ')
-input_file_name = input('Введите название файла: ')
-input_profession = input('Введите название профессии: ')
-
-input_conect = InputConect(input_file_name, input_profession)
-print(f'Динамика уровня зарплат по годам: {input_conect.data.vacancies_data}')
-print(f'Динамика количества вакансий по годам: {input_conect.data.vacancies_counter}')
-print(f'Динамика уровня зарплат по годам для выбранной профессии: {input_conect.data.profession_data}')
-print(f'Динамика количества вакансий по годам для выбранной профессии: {input_conect.data.profession_counter}')
-print(f'Уровень зарплат по городам (в порядке убывания): {input_conect.data.cut_city_data}')
-print(f'Доля вакансий по городам (в порядке убывания): {input_conect.data.cut_city_procent}')
-vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
-if vacancy_or_statistics == 'Вакансии':
-    wb = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
-    wb.generate_excel()
-else:
-    graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
-    graph.create_graph()
-
-parse_csv.separation.create_csv_files(input_conect.data.vacancies_list)
-# vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
-# graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession)
-# graph.create_graph()
-# pdf = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data)
-# pdf.generate_pdf()
+        if rates_file is None:
+            rates = None
+        else:
+            from currency_rates import load_rates
+
+            rates = load_rates(rates_file, currency_to_rub)
+        if os.path.isdir(self.file_name):
+            self.data = DataSet(self.file_name, self.profession, streaming=True, quantiles=quantiles, rates=rates)
+            self.data.set_data_from_year_files(self.file_name)
+        elif parallel:
+            self.data = DataSet(self.file_name, self.profession, streaming=True, quantiles=quantiles, rates=rates)
+            self.data.set_data_parallel()
+        else:
+            self.data = DataSet(self.file_name, self.profession, streaming, columnar, cache_dir, quantiles=quantiles,
+                                cube=cube, rates=rates)
+            self.data.set_data_for_graphics()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Статистика вакансий по годам и городам')
+    parser.add_argument('--streaming', action='store_true', help='читать вакансии потоком, не храня список')
+    parser.add_argument('--columnar', action='store_true', help='векторизованный подсчет по колоночной таблице')
+    parser.add_argument('--parallel', action='store_true', help='обрабатывать файл по частям в нескольких процессах')
+    parser.add_argument('--cache-dir', help='папка кеша колоночной таблицы, индекса и куба')
+    parser.add_argument('--cube', action='store_true', help='считать по кубу из папки кеша')
+    parser.add_argument('--quantiles', action='store_true', help='рассчитать медиану и перцентили зарплат')
+    parser.add_argument('--rates', help='файл исторических курсов валют (csv или xml ЦБ)')
+    parser.add_argument('--streaming-excel', action='store_true', help='писать excel в режиме write-only')
+    options = parser.parse_args()
+
+    vacancy_or_statistics = input('Вакансии или Статистика: ')
+    input_file_name = input('Введите название файла: ')
+    input_profession = input('Введите название профессии: ')
+
+    input_conect = InputConect(input_file_name, input_profession, options.streaming, options.columnar,
+                               options.parallel, options.cache_dir, options.quantiles, options.cube, options.rates)
+    print(f'Динамика уровня зарплат по годам: {input_conect.data.vacancies_data}')
+    print(f'Динамика количества вакансий по годам: {input_conect.data.vacancies_counter}')
+    print(f'Динамика уровня зарплат по годам для выбранной профессии: {input_conect.data.profession_data}')
+    print(f'Динамика количества вакансий по годам для выбранной профессии: {input_conect.data.profession_counter}')
+    print(f'Уровень зарплат по городам (в порядке убывания): {input_conect.data.cut_city_data}')
+    print(f'Доля вакансий по городам (в порядке убывания): {input_conect.data.cut_city_procent}')
+    if options.quantiles:
+        print(f'Медиана зарплат по годам: {input_conect.data.vacancies_quantiles["median"]}')
+    vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data = input_conect.data.get_data()
+    salary_quantiles, city_quantiles = input_conect.data.vacancies_quantiles, input_conect.data.city_quantiles
+    report_model = ReportModel.from_dataset(input_conect.data)
+    if vacancy_or_statistics == 'Вакансии':
+        wb = Report(input_profession, vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data,
+                    salary_quantiles, city_quantiles, report_model)
+        wb.generate_excel(streaming=options.streaming_excel)
+    else:
+        graph = SetGraph(vac_salary, vac_count, prof_salary, prof_count, city_procent, city_data, input_profession,
+                         salary_quantiles, city_quantiles, report_model)
+        graph.create_graph()
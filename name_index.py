@@ -0,0 +1,130 @@
+import json
+import os
+from functools import reduce
+
+import numpy as np
+
+
+class NameIndex:
+    """Инвертированный индекс триграмм по названиям вакансий колоночной таблицы
+
+    Индекс ищет названия, содержащие подстроку (как проверка profession in vacancy.name), и возвращает
+    номера строк таблицы с такими названиями без просмотра всего файла
+
+    Attributes:
+        names (list): Словарь названий вакансий, совпадает с VacancyTable.names
+        grams (dict): Для каждой триграммы - границы ее списка в postings
+        postings (np.ndarray): Номера названий, содержащих триграммы, списки идут подряд
+        row_order (np.ndarray): Номера строк таблицы, упорядоченные по номеру названия
+        row_offsets (np.ndarray): Границы строк каждого названия в row_order
+    """
+    def __init__(self, names: list, grams: dict, postings: np.ndarray, row_order: np.ndarray,
+                 row_offsets: np.ndarray):
+        """Инициализирует объект NameIndex
+
+        Args:
+            names (list): Словарь названий вакансий
+            grams (dict): Границы списков триграмм в postings
+            postings (np.ndarray): Номера названий по триграммам
+            row_order (np.ndarray): Номера строк, упорядоченные по номеру названия
+            row_offsets (np.ndarray): Границы строк каждого названия в row_order
+        """
+        self.names = names
+        self.grams = grams
+        self.postings = postings
+        self.row_order = row_order
+        self.row_offsets = row_offsets
+
+    @classmethod
+    def build(cls, table) -> 'NameIndex':
+        """Строит индекс по колоночной таблице
+
+        Args:
+            table (VacancyTable): Колоночная таблица вакансий
+
+        Returns:
+            NameIndex: Индекс названий
+
+        >>> from vacancy_table import VacancyTable
+        >>> rows = [{'name': name, 'salary_from': '1', 'salary_to': '1', 'salary_currency': 'RUR', 'area_name': 'Пермь', 'published_at': '2022'} for name in ('Аналитик', 'Программист', 'Аналитик данных')]
+        >>> NameIndex.build(VacancyTable.from_rows(rows)).rows('Аналитик').tolist()
+        [0, 2]
+        """
+        gram_lists = {}
+        for name_id, name in enumerate(table.names):
+            for gram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                gram_lists.setdefault(gram, []).append(name_id)
+        grams, postings, position = {}, [], 0
+        for gram, name_ids in gram_lists.items():
+            grams[gram] = (position, position + len(name_ids))
+            postings.extend(name_ids)
+            position += len(name_ids)
+        row_order = np.argsort(table.name_id, kind='stable').astype(np.int32)
+        row_offsets = np.concatenate(([0], np.cumsum(np.bincount(table.name_id, minlength=len(table.names)))))
+        return cls(list(table.names), grams, np.array(postings, dtype=np.int32), row_order, row_offsets)
+
+    def name_ids(self, query: str) -> list:
+        """Находит названия вакансий, содержащие подстроку
+
+        Кандидаты берутся из пересечения списков триграмм запроса и проверяются на точное вхождение.
+        Запросы короче трех символов проверяются по всему словарю названий
+
+        Args:
+            query (str): Подстрока, например название профессии
+
+        Returns:
+            list: Номера названий
+        """
+        if len(query) < 3:
+            return [name_id for name_id, name in enumerate(self.names) if query in name]
+        lists = []
+        for gram in {query[i:i + 3] for i in range(len(query) - 2)}:
+            if gram not in self.grams:
+                return []
+            start, end = self.grams[gram]
+            lists.append(self.postings[start:end])
+        lists.sort(key=len)
+        candidates = reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), lists)
+        return [name_id for name_id in candidates.tolist() if query in self.names[name_id]]
+
+    def rows(self, query: str) -> np.ndarray:
+        """Находит строки таблицы, в названии которых есть подстрока
+
+        Args:
+            query (str): Подстрока, например название профессии
+
+        Returns:
+            np.ndarray: Номера строк по возрастанию
+        """
+        slices = [self.row_order[self.row_offsets[i]:self.row_offsets[i + 1]] for i in self.name_ids(query)]
+        return np.sort(np.concatenate(slices)) if slices else np.zeros(0, dtype=np.int32)
+
+    def save(self, directory: str):
+        """Сохраняет индекс в папку
+
+        Args:
+            directory (str): Папка индекса
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'postings.npy'), self.postings)
+        np.save(os.path.join(directory, 'row_order.npy'), self.row_order)
+        np.save(os.path.join(directory, 'row_offsets.npy'), self.row_offsets)
+        with open(os.path.join(directory, 'grams.json'), 'w', encoding='utf-8') as file:
+            json.dump({'names': self.names, 'grams': list(self.grams.items())}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str) -> 'NameIndex':
+        """Загружает индекс из папки, массивы отображаются в память
+
+        Args:
+            directory (str): Папка индекса
+
+        Returns:
+            NameIndex: Индекс названий
+        """
+        with open(os.path.join(directory, 'grams.json'), encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data['names'], {gram: tuple(bounds) for gram, bounds in data['grams']},
+                   np.load(os.path.join(directory, 'postings.npy'), mmap_mode='r'),
+                   np.load(os.path.join(directory, 'row_order.npy'), mmap_mode='r'),
+                   np.load(os.path.join(directory, 'row_offsets.npy'), mmap_mode='r'))
@@ -1,4 +1,5 @@
 import csv
+import os
 
 
 def csv_distributor(file="C:/Users/Глеб/PycharmProjects/task2-2/v_year2.csv"):
@@ -22,21 +23,24 @@ def csv_distributor(file="C:/Users/Глеб/PycharmProjects/task2-2/v_year2.csv"
     return years_csv, title
 
 
-def create_csv_files(title: list, years_vacancies: dict):
+def create_csv_files(title: list, years_vacancies: dict, directory: str = 'CSV'):
     """
     Создаёт новые CSV-файлы в в папке CSV
 
     Args:
         years_vacancies (dict): словарь со списками вакансий, привязанных к году
         title (list): cписок с заголовками
+        directory (str): папка для файлов, создаётся при необходимости
     """
+    os.makedirs(directory, exist_ok=True)
     for year in years_vacancies:
-        with open(f'CSV/{year}.csv', 'w', encoding='utf-8-sig') as new_file:
+        with open(os.path.join(directory, f'{year}.csv'), 'w', encoding='utf-8-sig', newline='') as new_file:
             writer = csv.writer(new_file)
             writer.writerow(title)
             for row in years_vacancies[year]:
                 writer.writerow(row)
 
 
-csv_dict, title = csv_distributor()
-create_csv_files(title, csv_dict)
+if __name__ == '__main__':
+    csv_dict, title = csv_distributor()
+    create_csv_files(title, csv_dict)
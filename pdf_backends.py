@@ -0,0 +1,359 @@
+import base64
+import io
+import os
+import shutil
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+
+WKHTMLTOPDF_PATHS = (r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe',)
+PAGE_SIZE = (8.27, 11.69)
+PAGE_MARGIN = 0.5
+HEADING_HEIGHT = 0.5
+ROW_HEIGHT = 0.26
+
+
+class ReportHtmlParser(HTMLParser):
+    """Разбирает html отчета простой разметки template.html на блоки: заголовки h1, изображения и таблицы
+
+    Таблица, в ячейках которой лежат другие таблицы, становится одним блоком из нескольких таблиц рядом
+
+    Attributes:
+        blocks (list): Блоки ('heading', текст), ('image', адрес) и ('tables', список таблиц),
+            таблица - список строк, первая строка - заголовок
+        heading (list): Части текста текущего заголовка или None вне заголовка
+        tables (list): Стек открытых таблиц: строки, текущая строка, текущая ячейка и вложенные таблицы
+    """
+    def __init__(self):
+        """Инициализирует объект ReportHtmlParser
+        """
+        super().__init__()
+        self.blocks = []
+        self.heading = None
+        self.tables = []
+
+    def handle_starttag(self, tag: str, attrs: list):
+        if tag == 'h1' and not self.tables:
+            self.heading = []
+        elif tag == 'img' and not self.tables:
+            self.blocks.append(('image', dict(attrs).get('src', '')))
+        elif tag == 'table':
+            self.tables.append({'rows': [], 'row': None, 'cell': None, 'nested': []})
+        elif tag == 'tr' and self.tables:
+            self.tables[-1]['row'] = []
+        elif tag in ('td', 'th') and self.tables:
+            self.tables[-1]['cell'] = []
+
+    def handle_endtag(self, tag: str):
+        if tag == 'h1' and self.heading is not None:
+            self.blocks.append(('heading', ' '.join(''.join(self.heading).split())))
+            self.heading = None
+        elif tag == 'table' and self.tables:
+            table = self.tables.pop()
+            if self.tables:
+                self.tables[-1]['nested'].append(table['rows'])
+            else:
+                self.blocks.append(('tables', table['nested'] or [table['rows']]))
+        elif tag in ('td', 'th') and self.tables and self.tables[-1]['cell'] is not None:
+            table = self.tables[-1]
+            if table['row'] is not None:
+                table['row'].append(' '.join(''.join(table['cell']).split()))
+            table['cell'] = None
+        elif tag == 'tr' and self.tables and self.tables[-1]['row'] is not None:
+            table = self.tables[-1]
+            if table['row'] and not table['nested']:
+                table['rows'].append(table['row'])
+            table['row'] = None
+
+    def handle_data(self, data: str):
+        if self.tables and self.tables[-1]['cell'] is not None:
+            self.tables[-1]['cell'].append(data)
+        elif self.heading is not None:
+            self.heading.append(data)
+
+
+def parse_report_html(html: str) -> list:
+    """Разбирает html отчета на блоки, см. ReportHtmlParser
+
+    Args:
+        html (str): html страница отчета
+
+    Returns:
+        list: Блоки отчета
+
+    >>> parse_report_html('<h1><strong>Отчет</strong></h1><table><tr><th>Год</th></tr><tr><td> 2022 </td></tr></table>')
+    [('heading', 'Отчет'), ('tables', [[['Год'], ['2022']]])]
+    """
+    parser = ReportHtmlParser()
+    parser.feed(html)
+    parser.close()
+    return parser.blocks
+
+
+def read_image(source: str):
+    """Загружает изображение по адресу из html: data URI с base64, file URI или путь к файлу. Если абсолютного пути
+    нет на этой машине, файл ищется по имени в текущей папке
+
+    Args:
+        source (str): Адрес изображения
+
+    Returns:
+        np.ndarray or None: Пиксели изображения или None, если изображение не найдено или это не png
+    """
+    from matplotlib.image import imread
+
+    if source.startswith('data:'):
+        header, _, data = source.partition(',')
+        if not header.startswith('data:image/png') or ';base64' not in header:
+            return None
+        return imread(io.BytesIO(base64.b64decode(data)), format='png')
+    if source.startswith('file:'):
+        source = url2pathname(urlparse(source).path)
+    for path in (source, os.path.basename(source.replace('\\', '/'))):
+        if path and os.path.isfile(path):
+            return imread(path)
+    return None
+
+
+def write_simple_pdf(html: str, file_name: str) -> str:
+    """Создает pdf без внешних программ: блоки html отчета раскладываются по страницам A4 средствами matplotlib.
+    Длинные таблицы продолжаются на следующих страницах с повтором заголовка
+
+    Args:
+        html (str): html страница отчета простой разметки template.html
+        file_name (str): Название pdf файла
+
+    Returns:
+        str: Название pdf файла
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    width, height = PAGE_SIZE
+    content_width = width - 2 * PAGE_MARGIN
+    page_rows = int((height - 2 * PAGE_MARGIN) / ROW_HEIGHT) - 1
+    with PdfPages(file_name) as pdf:
+        page, top = Figure(figsize=PAGE_SIZE), PAGE_MARGIN
+
+        def new_page():
+            nonlocal page, top
+            pdf.savefig(page)
+            page, top = Figure(figsize=PAGE_SIZE), PAGE_MARGIN
+
+        def place(block_height: float):
+            nonlocal top
+            if top + block_height > height - PAGE_MARGIN and top > PAGE_MARGIN:
+                new_page()
+            axes = page.add_axes((PAGE_MARGIN / width, 1 - (top + block_height) / height,
+                                  content_width / width, block_height / height))
+            axes.axis('off')
+            top += block_height
+            return axes
+
+        for kind, value in parse_report_html(html):
+            if kind == 'heading':
+                place(HEADING_HEIGHT).text(0.5, 0.5, value, ha='center', va='center', fontsize=13,
+                                           fontweight='bold', wrap=True)
+            elif kind == 'image':
+                image = read_image(value)
+                if image is not None:
+                    image_height = min(content_width * image.shape[0] / image.shape[1], height - 2 * PAGE_MARGIN)
+                    place(image_height).imshow(image)
+            else:
+                tables = [table for table in value if table]
+                body_rows = max((len(table) - 1 for table in tables), default=0)
+                start = 0
+                while tables:
+                    free = int((height - PAGE_MARGIN - top) / ROW_HEIGHT) - 1
+                    if free < min(2, body_rows - start) or free < 0:
+                        new_page()
+                        free = page_rows
+                    count = min(free, body_rows - start)
+                    axes = place((max(count, 1) + 1) * ROW_HEIGHT)
+                    for index, table in enumerate(tables):
+                        rows = table[1 + start:1 + start + count]
+                        if not rows and start:
+                            continue
+                        rows = rows or [[''] * len(table[0])]
+                        share = (len(rows) + 1) / (max(count, 1) + 1)
+                        cells = axes.table(cellText=rows, colLabels=table[0], cellLoc='center',
+                                           bbox=(index / len(tables) + 0.01, 1 - share,
+                                                 1 / len(tables) - 0.02, share))
+                        cells.auto_set_font_size(False)
+                        cells.set_fontsize(7)
+                    start += count
+                    if start >= body_rows:
+                        break
+        pdf.savefig(page)
+    return file_name
+
+
+def write_wkhtmltopdf(html: str, file_name: str, configuration, options: dict) -> str:
+    """Создает pdf программой wkhtmltopdf
+
+    Args:
+        html (str): html страница отчета
+        file_name (str): Название pdf файла
+        configuration (object): Настройки pdfkit
+        options (dict): Параметры командной строки wkhtmltopdf
+
+    Returns:
+        str: Название pdf файла
+    """
+    import pdfkit
+
+    pdfkit.from_string(html, file_name, configuration=configuration, options=options)
+    return file_name
+
+
+class PdfBackend(ABC):
+    """Способ превращения html отчетов в pdf файлы с пулом обработчиков, который живет между пакетами
+
+    Attributes:
+        workers (int): Количество обработчиков, по умолчанию по числу ядер. 0 - создавать pdf в этом процессе
+        executor (Executor): Пул обработчиков, создается при первом пакете
+    """
+    def __init__(self, workers: int = None):
+        """Инициализирует объект PdfBackend
+
+        Args:
+            workers (int): Количество обработчиков, 0 - без пула
+        """
+        self.workers = workers
+        self.executor = None
+
+    @abstractmethod
+    def create_executor(self):
+        """Создает пул обработчиков
+
+        Returns:
+            Executor: Пул
+        """
+
+    @abstractmethod
+    def job(self, html: str, file_name: str) -> tuple:
+        """Описывает создание одного pdf файла: функция, которую можно передать в процесс, и ее аргументы
+
+        Args:
+            html (str): html страница отчета
+            file_name (str): Название pdf файла
+
+        Returns:
+            tuple: Функция и аргументы
+        """
+
+    def render_batch(self, documents) -> list:
+        """Создает pdf файлы для пакета html страниц параллельно в пуле обработчиков
+
+        Args:
+            documents (iterable): Пары (html страница, название pdf файла)
+
+        Returns:
+            list: Названия созданных pdf файлов в порядке documents
+        """
+        jobs = [self.job(html, file_name) for html, file_name in documents]
+        if self.workers == 0:
+            return [function(*arguments) for function, *arguments in jobs]
+        if self.executor is None:
+            self.executor = self.create_executor()
+        futures = [self.executor.submit(*job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def render(self, html: str, file_name: str) -> str:
+        """Создает один pdf файл
+
+        Args:
+            html (str): html страница отчета
+            file_name (str): Название pdf файла
+
+        Returns:
+            str: Название pdf файла
+        """
+        return self.render_batch([(html, file_name)])[0]
+
+    def close(self):
+        """Останавливает пул обработчиков
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self) -> 'PdfBackend':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class WkhtmltopdfBackend(PdfBackend):
+    """Создание pdf программой wkhtmltopdf через pdfkit
+
+    Это не пул процессов wkhtmltopdf: каждый pdf файл - отдельный запуск программы. Один запуск wkhtmltopdf
+    склеивает все переданные страницы в один pdf, поэтому пакет отчетов нельзя отдать одному процессу.
+    Путь к программе и настройки pdfkit определяются один раз, а потоки пула только ждут одновременно
+    работающие процессы. Между пакетами переиспользуются потоки, но не сами процессы wkhtmltopdf
+
+    Attributes:
+        configuration (object): Настройки pdfkit
+        options (dict): Параметры командной строки wkhtmltopdf
+    """
+    def __init__(self, executable: str, workers: int = None, options: dict = None):
+        """Инициализирует объект WkhtmltopdfBackend
+
+        Args:
+            executable (str): Путь к wkhtmltopdf, см. find_wkhtmltopdf
+            workers (int): Количество одновременных запусков wkhtmltopdf
+            options (dict): Параметры командной строки wkhtmltopdf
+        """
+        import pdfkit
+
+        super().__init__(workers)
+        self.configuration = pdfkit.configuration(wkhtmltopdf=executable)
+        self.options = {'enable-local-file-access': ''} if options is None else options
+
+    def create_executor(self):
+        return ThreadPoolExecutor(self.workers)
+
+    def job(self, html: str, file_name: str) -> tuple:
+        return write_wkhtmltopdf, html, file_name, self.configuration, self.options
+
+
+class PythonPdfBackend(PdfBackend):
+    """Создание pdf без внешних программ, см. write_simple_pdf. Страницы раскладываются в процессах пула,
+    который переиспользуется между пакетами
+    """
+    def create_executor(self):
+        return ProcessPoolExecutor(self.workers)
+
+    def job(self, html: str, file_name: str) -> tuple:
+        return write_simple_pdf, html, file_name
+
+
+def find_wkhtmltopdf():
+    """Ищет wkhtmltopdf в PATH и в стандартных папках установки
+
+    Returns:
+        str or None: Путь к программе или None, если она не установлена
+    """
+    found = shutil.which('wkhtmltopdf')
+    if found:
+        return found
+    return next((path for path in WKHTMLTOPDF_PATHS if os.path.isfile(path)), None)
+
+
+def default_backend(workers: int = None) -> PdfBackend:
+    """Выбирает способ создания pdf: wkhtmltopdf, если программа установлена, иначе создание средствами Python
+
+    Args:
+        workers (int): Количество обработчиков
+
+    Returns:
+        PdfBackend: Способ создания pdf
+    """
+    executable = find_wkhtmltopdf()
+    if executable is None:
+        return PythonPdfBackend(workers)
+    return WkhtmltopdfBackend(executable, workers)
@@ -0,0 +1,67 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик для поиска сразу нескольких подстрок в названии вакансии
+
+    Время поиска зависит от длины текста и числа найденных совпадений, но не от количества шаблонов
+
+    Attributes:
+        patterns (tuple): Шаблоны (названия профессий)
+        transitions (list): Переходы автомата по символам для каждого состояния
+        fail (list): Суффиксные ссылки состояний
+        outputs (list): Номера шаблонов, которые заканчиваются в каждом состоянии
+    """
+    def __init__(self, patterns):
+        """Строит автомат по шаблонам
+
+        Args:
+            patterns (iterable): Шаблоны
+
+        >>> AhoCorasick(['Программист', 'аналитик', 'Python']).find('Программист Python')
+        {0, 2}
+        """
+        self.patterns = tuple(patterns)
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append(set())
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state].add(index)
+
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.transitions[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.transitions[fallback].get(char, 0)
+                self.outputs[child] |= self.outputs[self.fail[child]]
+
+    def find(self, text: str) -> set:
+        """Находит шаблоны, которые входят в текст как подстроки
+
+        Args:
+            text (str): Текст
+
+        Returns:
+            set: Номера найденных шаблонов
+        """
+        found = set(self.outputs[0])
+        state = 0
+        for char in text:
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            if self.outputs[state]:
+                found |= self.outputs[state]
+        return found
@@ -0,0 +1,195 @@
+import math
+
+
+QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+QUANTILE_TITLES = {'p25': '25-й перцентиль', 'median': 'Медианная зарплата', 'p75': '75-й перцентиль',
+                   'p90': '90-й перцентиль'}
+RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Скетч квантилей с логарифмическими корзинами (DDSketch)
+
+    Значение x попадает в корзину ceil(log_gamma(x)), поэтому любой квантиль восстанавливается с относительной
+    погрешностью не больше relative_accuracy, а количество корзин зависит только от разброса зарплат,
+    но не от количества вакансий. Слияние - сложение счетчиков корзин, оно точное, ассоциативное
+    и не зависит от того, как данные были разбиты между процессами
+
+    Attributes:
+        relative_accuracy (float): Относительная погрешность квантилей
+        gamma (float): Основание логарифма корзин
+        buckets (dict): Количество значений в каждой корзине
+        zero_count (int): Количество значений меньше 1 (нулевые зарплаты)
+    """
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, buckets: dict = None, zero_count: int = 0):
+        """Инициализирует объект QuantileSketch
+
+        Args:
+            relative_accuracy (float): Относительная погрешность квантилей
+            buckets (dict): Количество значений по корзинам
+            zero_count (int): Количество нулевых значений
+
+        >>> sketch = QuantileSketch()
+        >>> for salary in range(1000, 101000, 1000):
+        ...     sketch.add(salary)
+        >>> sketch.quantiles()
+        {'p25': 25091, 'median': 49528, 'p75': 75382, 'p90': 90249}
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets = {} if buckets is None else buckets
+        self.zero_count = zero_count
+
+    def bucket(self, value) -> int:
+        """Возвращает номер корзины значения
+
+        Args:
+            value (int or float): Значение не меньше 1
+
+        Returns:
+            int: Номер корзины
+        """
+        return math.ceil(math.log(value) / math.log(self.gamma))
+
+    def bucket_array(self, values: 'np.ndarray') -> 'np.ndarray':
+        """Возвращает номера корзин для массива значений, значения меньше 1 получают -1
+
+        Args:
+            values (np.ndarray): Значения
+
+        Returns:
+            np.ndarray: Номера корзин, int64
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.float64)
+        buckets = np.full(len(values), -1, dtype=np.int64)
+        positive = values >= 1
+        buckets[positive] = np.ceil(np.log(values[positive]) / math.log(self.gamma))
+        return buckets
+
+    def add(self, value, count: int = 1):
+        """Добавляет значение
+
+        Args:
+            value (int or float): Значение
+            count (int): Сколько раз добавить значение
+        """
+        if value < 1:
+            self.zero_count += count
+            return
+        bucket = self.bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Добавляет счетчики другого скетча с той же погрешностью
+
+        Args:
+            other (QuantileSketch): Другой скетч
+
+        Returns:
+            QuantileSketch: Этот же скетч
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Нельзя объединить скетчи с разной погрешностью')
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    def __add__(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        return QuantileSketch(self.relative_accuracy, dict(self.buckets), self.zero_count).merge(other)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, QuantileSketch) and self.relative_accuracy == other.relative_accuracy
+                and self.buckets == other.buckets and self.zero_count == other.zero_count)
+
+    @property
+    def count(self) -> int:
+        """Количество значений"""
+        return self.zero_count + sum(self.buckets.values())
+
+    def quantile(self, q: float) -> int:
+        """Оценивает квантиль
+
+        Args:
+            q (float): Уровень квантиля от 0 до 1
+
+        Returns:
+            int: Значение квантиля, для пустого скетча 0
+        """
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                return int(2 * self.gamma ** bucket / (self.gamma + 1))
+        return 0
+
+    def quantiles(self) -> dict:
+        """Оценивает квартили и 90-й перцентиль
+
+        Returns:
+            dict: Значения квантилей по названиям из QUANTILES
+        """
+        return {name: self.quantile(q) for name, q in QUANTILES.items()}
+
+    def to_dict(self) -> dict:
+        """Преобразует скетч в словарь, пригодный для json
+
+        Returns:
+            dict: Скетч
+        """
+        return {'relative_accuracy': self.relative_accuracy, 'buckets': list(self.buckets.items()),
+                'zero_count': self.zero_count}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        """Создает скетч из словаря, полученного через to_dict
+
+        Args:
+            data (dict): Скетч
+
+        Returns:
+            QuantileSketch: Скетч
+        """
+        return cls(data['relative_accuracy'], dict(data['buckets']), data['zero_count'])
+
+
+def grouped_sketches(group_keys: 'np.ndarray', values: 'np.ndarray', size: int,
+                     relative_accuracy: float = RELATIVE_ACCURACY) -> list:
+    """Строит скетчи квантилей сразу для всех групп одной сортировкой пар (группа, корзина)
+
+    Args:
+        group_keys (np.ndarray): Номера групп
+        values (np.ndarray): Значения
+        size (int): Количество групп
+        relative_accuracy (float): Относительная погрешность квантилей
+
+    Returns:
+        list: Скетч для каждой группы
+
+    >>> import numpy as np
+    >>> [sketch.count for sketch in grouped_sketches(np.array([0, 1, 0]), np.array([100, 0, 300]), 2)]
+    [2, 1]
+    """
+    import numpy as np
+
+    sketches = [QuantileSketch(relative_accuracy) for _ in range(size)]
+    buckets = sketches[0].bucket_array(values) if size else np.zeros(0, dtype=np.int64)
+    if not len(buckets):
+        return sketches
+    offset = buckets.min()
+    span = int(buckets.max() - offset) + 1
+    pairs, counts = np.unique(np.asarray(group_keys, dtype=np.int64) * span + (buckets - offset),
+                              return_counts=True)
+    for pair, count in zip(pairs.tolist(), counts.tolist()):
+        group, bucket = divmod(pair, span)
+        bucket += int(offset)
+        if bucket < 0:
+            sketches[group].zero_count += count
+        else:
+            sketches[group].buckets[bucket] = count
+    return sketches
@@ -0,0 +1,160 @@
+from typing import NamedTuple
+
+from quantiles import QUANTILE_TITLES
+
+
+class ReportModel(NamedTuple):
+    """Неизменяемые данные отчета, подготовленные один раз для pdf, excel и графиков
+
+    Все ряды по годам выровнены по years, ряды по городам - по cities и share_cities
+
+    Attributes:
+        profession (str): Название профессии
+        years (tuple): Годы
+        salaries (tuple): Средние зарплаты по годам
+        counts (tuple): Количество вакансий по годам
+        profession_salaries (tuple): Средние зарплаты профессии по годам
+        profession_counts (tuple): Количество вакансий профессии по годам
+        quantile_names (tuple): Названия квантилей из QUANTILES, для которых есть ряды
+        year_quantiles (tuple): Ряды квантилей зарплат по годам в порядке quantile_names
+        cities (tuple): Города с наибольшими средними зарплатами
+        city_salaries (tuple): Средние зарплаты в cities
+        city_medians (tuple): Медианные зарплаты в cities или None, если квантилей нет
+        share_cities (tuple): Города с наибольшей долей вакансий
+        shares (tuple): Доли вакансий в share_cities
+        share_labels (tuple): Доли вакансий в процентах в виде строк
+    """
+    profession: str
+    years: tuple
+    salaries: tuple
+    counts: tuple
+    profession_salaries: tuple
+    profession_counts: tuple
+    quantile_names: tuple
+    year_quantiles: tuple
+    cities: tuple
+    city_salaries: tuple
+    city_medians: tuple
+    share_cities: tuple
+    shares: tuple
+    share_labels: tuple
+
+    @classmethod
+    def build(cls, profession: str, vacancies_salary: dict, vacancies_count: dict, profes_salary: dict,
+              profes_count: dict, cities_procent: dict, cities_data: dict, salary_quantiles: dict = None,
+              city_quantiles: dict = None) -> 'ReportModel':
+        """Выравнивает словари статистики по годам и городам за один проход по каждому
+
+        Args:
+            profession (str): Название профессии
+            vacancies_salary (dict): Средние зарплаты по годам
+            vacancies_count (dict): Количество вакансий по годам
+            profes_salary (dict): Средние зарплаты профессии по годам, пропущенные годы считаются нулевыми
+            profes_count (dict): Количество вакансий профессии по годам, пропущенные годы считаются нулевыми
+            cities_procent (dict): Доли вакансий по городам
+            cities_data (dict): Средние зарплаты по городам
+            salary_quantiles (dict): Квантили зарплат по годам, см. DataSet.vacancies_quantiles
+            city_quantiles (dict): Квантили зарплат по городам, см. DataSet.city_quantiles
+
+        Returns:
+            ReportModel: Данные отчета
+
+        >>> model = ReportModel.build('Программист', {2017: 20000}, {2017: 50}, {2017: 50000}, {2017: 5}, {'Москва': 0.5612}, {'Москва': 10000})
+        >>> model.year_rows(), model.city_share_rows()
+        ([(2017, 20000, 50000, 50, 5)], [('Москва', '56.12%')])
+        """
+        years = tuple(vacancies_count)
+        salary_quantiles = salary_quantiles or {}
+        city_quantiles = city_quantiles or {}
+        cities = tuple(cities_data)
+        return cls(profession, years,
+                   tuple(vacancies_salary[year] for year in years),
+                   tuple(vacancies_count[year] for year in years),
+                   tuple(profes_salary.get(year, 0) for year in years),
+                   tuple(profes_count.get(year, 0) for year in years),
+                   tuple(salary_quantiles),
+                   tuple(tuple(values[year] for year in years) for values in salary_quantiles.values()),
+                   cities, tuple(cities_data.values()),
+                   tuple(city_quantiles['median'][city] for city in cities) if 'median' in city_quantiles else None,
+                   tuple(cities_procent), tuple(cities_procent.values()),
+                   tuple(f'{round(procent * 100, 2)}%' for procent in cities_procent.values()))
+
+    @classmethod
+    def from_dataset(cls, data) -> 'ReportModel':
+        """Создает данные отчета по обработанному DataSet для его первой профессии
+
+        Args:
+            data (DataSet): Данные, для которых выполнен set_data_for_graphics или другой расчет статистики
+
+        Returns:
+            ReportModel: Данные отчета
+        """
+        return cls.build(data.professions[0], data.vacancies_data, data.vacancies_counter, data.profession_data,
+                         data.profession_counter, data.cut_city_procent, data.cut_city_data,
+                         data.vacancies_quantiles, data.city_quantiles)
+
+    def quantile_titles(self) -> list:
+        """Создает заголовки столбцов с квантилями зарплат по годам
+
+        Returns:
+            list: Заголовки, пустой список, если квантилей нет
+        """
+        return [QUANTILE_TITLES[name] for name in self.quantile_names]
+
+    def year_quantile(self, name: str) -> tuple:
+        """Возвращает ряд квантиля зарплат по годам
+
+        Args:
+            name (str): Название квантиля из QUANTILES
+
+        Returns:
+            tuple: Значения по годам
+        """
+        return self.year_quantiles[self.quantile_names.index(name)]
+
+    def year_rows(self) -> list:
+        """Создает строки таблицы по годам: год, средняя зарплата, зарплата профессии, количество вакансий,
+        количество вакансий профессии и квантили
+
+        Returns:
+            list: Строки таблицы
+        """
+        return list(zip(self.years, self.salaries, self.profession_salaries, self.counts, self.profession_counts,
+                        *self.year_quantiles))
+
+    def city_columns(self) -> list:
+        """Создает заголовки таблицы зарплат по городам
+
+        Returns:
+            list: Заголовки
+        """
+        return ['Город', 'Уровень зарплат'] + ([QUANTILE_TITLES['median']] if self.city_medians is not None else [])
+
+    def city_salary_rows(self) -> list:
+        """Создает строки таблицы зарплат по городам в порядке city_columns
+
+        Returns:
+            list: Строки таблицы
+        """
+        if self.city_medians is not None:
+            return list(zip(self.cities, self.city_salaries, self.city_medians))
+        return list(zip(self.cities, self.city_salaries))
+
+    def city_share_rows(self) -> list:
+        """Создает строки таблицы долей вакансий по городам
+
+        Returns:
+            list: Пары (город, доля в процентах)
+        """
+        return list(zip(self.share_cities, self.share_labels))
+
+    def share_chart_rows(self) -> list:
+        """Создает доли вакансий по городам числами вместе с долей остальных городов, как на круговой диаграмме
+
+        Returns:
+            list: Пары (город, доля), последняя пара - ('Другие', остаток)
+
+        >>> ReportModel.build('Программист', {}, {}, {}, {}, {'Москва': 0.5, 'Пермь': 0.25}, {}).share_chart_rows()
+        [('Москва', 0.5), ('Пермь', 0.25), ('Другие', 0.25)]
+        """
+        return list(zip(self.share_cities, self.shares)) + [('Другие', max(1 - sum(self.shares), 0))]
@@ -0,0 +1,144 @@
+from array import array
+from itertools import islice
+from typing import NamedTuple
+
+import numpy as np
+
+from currency_rates import RateTable
+from dates import month_ordinals
+
+
+CURRENCIES = ("AZN", "BYR", "EUR", "GEL", "KGS", "KZT", "RUR", "UAH", "USD", "UZS")
+DATE_CHUNK = 1 << 16
+
+
+class VacancyRecord(NamedTuple):
+    """Легковесное представление вакансии, которое выдает VacancyTable при построчном обходе
+
+    Attributes:
+        name (str): Имя профессии
+        area_name (str): Город, в котором расположена вакансия
+        published_at (int): Год публикации
+        avarage_salary (int): Среднее значение оклада в рублях
+        published_month (int): Номер месяца публикации (год * 12 + месяц - 1)
+    """
+    name: str
+    area_name: str
+    published_at: int
+    avarage_salary: int
+    published_month: int = 0
+
+
+class VacancyTable:
+    """Колоночное хранилище вакансий на массивах numpy
+
+    Attributes:
+        salary_from (np.ndarray): Нижние границы вилок оклада, int32
+        salary_to (np.ndarray): Верхние границы вилок оклада, int32
+        salary_currency (np.ndarray): Коды валют оклада (индексы в currencies), uint8
+        published_at (np.ndarray): Годы публикации, int16
+        published_month (np.ndarray): Номера месяцев публикации (год * 12 + месяц - 1), int32
+        area_id (np.ndarray): Коды городов (индексы в cities), int32
+        name_id (np.ndarray): Коды названий вакансий (индексы в names), int32
+        currencies (list): Словарь валют
+        cities (list): Словарь городов в порядке первого появления
+        names (list): Словарь названий вакансий в порядке первого появления
+    """
+    def __init__(self, salary_from: np.ndarray, salary_to: np.ndarray, salary_currency: np.ndarray,
+                 published_at: np.ndarray, area_id: np.ndarray, name_id: np.ndarray,
+                 currencies: list, cities: list, names: list, published_month: np.ndarray = None):
+        """Инициализирует объект VacancyTable из готовых колонок
+
+        Args:
+            salary_from (np.ndarray): Нижние границы вилок оклада
+            salary_to (np.ndarray): Верхние границы вилок оклада
+            salary_currency (np.ndarray): Коды валют оклада
+            published_at (np.ndarray): Годы публикации
+            area_id (np.ndarray): Коды городов
+            name_id (np.ndarray): Коды названий вакансий
+            currencies (list): Словарь валют
+            cities (list): Словарь городов
+            names (list): Словарь названий вакансий
+            published_month (np.ndarray): Номера месяцев публикации, по умолчанию январь года публикации
+        """
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.salary_currency = salary_currency
+        self.published_at = published_at
+        self.area_id = area_id
+        self.name_id = name_id
+        self.currencies = currencies
+        self.cities = cities
+        self.names = names
+        self.published_month = (published_at.astype(np.int32) * 12 if published_month is None
+                                else published_month)
+
+    @classmethod
+    def from_rows(cls, rows) -> 'VacancyTable':
+        """Строит таблицу за один проход по очищенным строкам csv файла
+
+        Args:
+            rows (iterable): Словари с информацией о вакансиях
+
+        Returns:
+            VacancyTable: Колоночное хранилище вакансий
+
+        >>> table = VacancyTable.from_rows([{'name': 'Аналитик', 'salary_from': '20000.0', 'salary_to': '30000.0', 'salary_currency': 'RUR', 'area_name': 'Екатеринбург', 'published_at': '2022-07-05T18:19:30+0300'}])
+        >>> len(table), table.cities, table.published_at.tolist()
+        (1, ['Екатеринбург'], [2022])
+        """
+        salary_from, salary_to = array('i'), array('i')
+        salary_currency, published_month = array('B'), []
+        area_id, name_id = array('i'), array('i')
+        currency_ids = {currency: index for index, currency in enumerate(CURRENCIES)}
+        city_ids, name_ids = {}, {}
+        rows = iter(rows)
+        while chunk := list(islice(rows, DATE_CHUNK)):
+            for row in chunk:
+                salary_from.append(int(row['salary_from'].split('.')[0]))
+                salary_to.append(int(row['salary_to'].split('.')[0]))
+                salary_currency.append(currency_ids.setdefault(row['salary_currency'], len(currency_ids)))
+                area_id.append(city_ids.setdefault(row['area_name'], len(city_ids)))
+                name_id.append(name_ids.setdefault(row['name'], len(name_ids)))
+            published_month.append(month_ordinals([row['published_at'] for row in chunk]))
+        published_month = np.concatenate(published_month) if published_month else np.zeros(0, dtype=np.int32)
+        return cls(np.array(salary_from, dtype=np.int32), np.array(salary_to, dtype=np.int32),
+                   np.array(salary_currency, dtype=np.uint8), (published_month // 12).astype(np.int16),
+                   np.array(area_id, dtype=np.int32), np.array(name_id, dtype=np.int32),
+                   list(currency_ids), list(city_ids), list(name_ids), published_month)
+
+    def __len__(self) -> int:
+        return len(self.published_at)
+
+    def average_salary(self, currency_to_rub, rows: np.ndarray = None) -> np.ndarray:
+        """Рассчитывает средний оклад вакансий в рублях так же, как Vacancy.avarage_salary
+
+        Args:
+            currency_to_rub (dict or RateTable): Курсы валют к рублю или исторические курсы по месяцам публикации
+            rows (np.ndarray): Номера строк, по умолчанию все строки
+
+        Returns:
+            np.ndarray: Средние оклады, int64
+        """
+        columns = self.salary_from, self.salary_to, self.salary_currency, self.published_month
+        salary_from, salary_to, currency, month = columns if rows is None else [column[rows] for column in columns]
+        if isinstance(currency_to_rub, RateTable):
+            rates = currency_to_rub.rate_array(self.currencies, currency, month)
+        else:
+            rates = np.array([currency_to_rub[name] for name in self.currencies], dtype=np.float64)[currency]
+        return ((salary_from.astype(np.int64) + salary_to) / 2 * rates).astype(np.int64)
+
+    def records(self, currency_to_rub):
+        """Построчно обходит таблицу
+
+        Args:
+            currency_to_rub (dict or RateTable): Курсы валют к рублю
+
+        Yields:
+            VacancyRecord: Вакансия
+        """
+        salaries = self.average_salary(currency_to_rub).tolist()
+        for name_id, area_id, year, salary, month in zip(self.name_id.tolist(), self.area_id.tolist(),
+                                                         self.published_at.tolist(), salaries,
+                                                         self.published_month.tolist()):
+            yield VacancyRecord(self.names[name_id], self.cities[area_id], year, salary, month)